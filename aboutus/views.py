@@ -1,5 +1,9 @@
+from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 
+from helpers.cache import cache_anonymous
 
+
+@method_decorator(cache_anonymous(), name='dispatch')
 class AboutUsPage(TemplateView):
     template_name = 'aboutus/aboutus.html'
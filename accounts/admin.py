@@ -4,6 +4,20 @@ from .models import StudentProfile, EmployerProfile, User
 """
 Register models to the Django admin interface
 """
-admin.site.register(StudentProfile)
-admin.site.register(EmployerProfile)
-admin.site.register(User)
+
+
+class UserAdmin(admin.ModelAdmin):
+    list_select_related = ('employer_profile', 'profile')
+
+
+class EmployerProfileAdmin(admin.ModelAdmin):
+    list_select_related = ('user',)
+
+
+class StudentProfileAdmin(admin.ModelAdmin):
+    list_select_related = ('user',)
+
+
+admin.site.register(StudentProfile, StudentProfileAdmin)
+admin.site.register(EmployerProfile, EmployerProfileAdmin)
+admin.site.register(User, UserAdmin)
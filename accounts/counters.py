@@ -0,0 +1,79 @@
+from django.core.cache import cache
+
+from .models import User
+
+
+"""
+Cached counts of users for the homepage  
+The counts are kept in the cache and updated by the `count_user` and `uncount_user` signals,
+when a count isn't cached (it expired or a user was deleted) it's counted again  
+
+"""
+
+COUNTERS = {
+    'students': {'is_student': True},
+    'employers': {'is_employer': True},
+}
+
+TIMEOUT = 60 * 60
+
+
+def _key(name) -> str:
+    return f'accounts:counter:{name}'
+
+
+def get_counters() -> dict:
+    """
+    Get every counter, only the counters that aren't cached are counted
+
+    @rtype: `dict`  
+    @return: the count for every counter in `COUNTERS`
+    """
+    cached = cache.get_many([_key(name) for name in COUNTERS])
+    counters = {}
+    for name, filters in COUNTERS.items():
+        value = cached.get(_key(name))
+        if value is None:
+            value = User.objects.filter(**filters).count()
+            cache.set(_key(name), value, TIMEOUT)
+        counters[name] = value
+    return counters
+
+
+def _counters_for(user) -> list:
+    return [name for name, filters in COUNTERS.items()
+            if all(getattr(user, field) == value for field, value in filters.items())]
+
+
+def increment_counters(user) -> None:
+    """
+    Add a new user to every counter they're counted in. Counters that aren't cached are left alone,
+    they're counted when they're read
+
+    @type user: `User`  
+    @param user: the user that was created
+    """
+    for name in _counters_for(user):
+        try:
+            cache.incr(_key(name), 1)
+        except ValueError:
+            pass
+
+
+def reset_counters(user) -> None:
+    """
+    Remove the counters a deleted user was counted in from the cache, so they're counted again.
+    A user's `post_delete` can be sent twice (deleting the profile deletes the user again),
+    so the counters aren't decremented
+
+    @type user: `User`  
+    @param user: the user that was deleted
+    """
+    cache.delete_many([_key(name) for name in _counters_for(user)])
+
+
+def clear_counters() -> None:
+    """
+    Remove every counter from the cache, so they're counted again. For users created without the signals
+    """
+    cache.delete_many([_key(name) for name in COUNTERS])
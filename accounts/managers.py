@@ -1,15 +1,29 @@
 from django.contrib.auth.models import BaseUserManager
+from django.db import models
 
 """
 UserManager for the accounts application  
-Currently we support the following user manager:
+Currently we support the following user manager and queryset:
 
 1. `**UserManager**` - implements helper methods for creating custom users and super users
+2. `**UserQuerySet**` - implements helper methods for querying users
 
 """
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+
+    def with_profiles(self):
+        """
+        Join the employer and student profiles in the same query, rendering a user (`User.__str__`)
+        or their profile doesn't need another query
+
+        @rtype: `QuerySet`
+        """
+        return self.select_related('employer_profile', 'profile')
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """
     Custom user manager  
     Provides helper methods for user management
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+"""
+An index for the company typeahead, `company_name__istartswith` compiles to `UPPER("company_name"::text) LIKE
+UPPER(%s)` on Postgres, which only an index on the same expression with `text_pattern_ops` can serve.
+Django 3.1 can't declare an index on an expression, so it's created here and only on Postgres
+"""
+
+INDEX = 'employer_company_name_upper'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{INDEX}" ON "accounts_employerprofile" '
+                              f'(UPPER("company_name"::text) text_pattern_ops)')
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{INDEX}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
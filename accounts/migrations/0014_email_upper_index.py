@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+"""
+An index for looking up users by email regardless of case, the bulk onboarding checks the emails of a chunk with
+`UPPER("email"::text) IN (...)`, which the unique index on `email` can't serve.
+Django 3.1 can't declare an index on an expression, so it's created here and only on Postgres, like
+`employer_company_name_upper`
+"""
+
+INDEX = 'user_email_upper'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{INDEX}" ON "accounts_user" (UPPER("email"::text))')
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{INDEX}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_company_name_prefix_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,12 +1,12 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.urls import reverse
-from django_unique_slugify import unique_slugify
 from phonenumber_field.modelfields import PhoneNumberField
 from cloudinary.models import CloudinaryField
 
 from accounts.managers import UserManager
 from connect_x.settings import DEBUG
+from helpers.slugs import unique_slug
 
 """
 Models for the accounts application  
@@ -37,6 +37,12 @@ class User(AbstractUser):
     is_employer = models.BooleanField(default=False)
     slug = models.SlugField(max_length=256, unique=False, blank=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # keyset pagination of all users
+            models.Index(fields=['date_joined', 'id'], name='user_date_joined_id')
+        ]
+
     def get_absolute_url(self):
         return reverse('profile')
 
@@ -48,6 +54,50 @@ class User(AbstractUser):
     def get_profile_pic_url(self):
         return self.profile_picture.url
 
+    def _listings(self, statuses, archived=None):
+        """
+        Listings that this student has an application for in one of the statuses specified
+
+        @type statuses: `list`  
+        @param statuses: the statuses of the applications  
+        @type archived: `bool`  
+        @param archived: if set, only include applications that the student has (not) archived  
+        @rtype: `QuerySet`
+        """
+
+        # imported here, the marketplace app imports accounts
+        from marketplace.models import Listing, Application
+
+        applications = Application.objects.filter(student=self, status__in=statuses)
+        if archived is not None:
+            applications = applications.filter(student_archived=archived)
+        return Listing.objects.filter(id__in=applications.values('listing_id'))
+
+    @property
+    def applications(self):
+        from marketplace.models import Application
+        return self._listings(Application.OPEN)
+
+    @property
+    def awaiting_confirm_acceptance(self):
+        from marketplace.models import Application
+        return self._listings([Application.AWAITING])
+
+    @property
+    def student_acceptances(self):
+        from marketplace.models import Application
+        return self._listings([Application.ACCEPTED], archived=False)
+
+    @property
+    def student_rejections(self):
+        from marketplace.models import Application
+        return self._listings([Application.REJECTED], archived=False)
+
+    @property
+    def student_interview_requests(self):
+        from marketplace.models import Application
+        return self._listings([Application.INTERVIEW], archived=False)
+
     def __str__(self):
         if self.is_employer:
             if self.employer_profile.company_name is not None:
@@ -70,19 +120,18 @@ class EmployerProfile(models.Model):
     company_website = models.URLField(blank=True)
 
     def slug_employer(self):
-        """Unique slugify related `User` instance with company's name"""
+        """Unique slugify related `User` instance with company's name, the slug is kept if the name didn't change"""
 
-        self.user.slug = f"{self.company_name}"
-        unique_slugify(self.user, self.user.slug)
+        self.user.slug = unique_slug(self.user, self.company_name)
 
     def archive_interview_request(self, listing, user):
-        listing.employer_interview_requests.remove(user)
+        listing.archive_employer_interview_request(user)
 
     def archive_acceptance(self, listing, user):
-        listing.employer_acceptances.remove(user)
+        listing.archive_employer_acceptance(user)
 
     def archive_rejection(self, listing, user):
-        listing.employer_rejections.remove(user)
+        listing.archive_employer_rejection(user)
 
     def __str__(self):
         return self.company_name
@@ -115,10 +164,9 @@ class StudentProfile(models.Model):
     link4 = models.URLField(null=True, blank=True)
 
     def slug_student(self):
-        """Unique slugify related `User` instance with student's full name"""
+        """Unique slugify related `User` instance with student's full name, the slug is kept if the name didn't change"""
 
-        self.user.slug = self.user.get_full_name
-        unique_slugify(self.user, self.user.slug)
+        self.user.slug = unique_slug(self.user, self.user.get_full_name)
 
     def archive_interview_request(self, listing):
         """
@@ -0,0 +1,58 @@
+from django.db import transaction
+
+from helpers.slugs import unique_slug
+from .models import User, StudentProfile, EmployerProfile
+
+
+"""
+Creating accounts  
+A new user and their profile are inserted once each in one transaction, with the slug allocated before the
+user is saved. The `create_profile`, `slug_student` and `slug_employer` signals skip the users created here,
+they're left for the users created some other way (`createsuperuser`, the admin and the tests)
+
+"""
+
+
+def profile_name(user, company_name=None) -> str:
+    """
+    The name a user's slug is made from, the company's name for employers and the full name for students
+
+    @type user: `User`  
+    @param company_name: the employer's company
+    @type company_name: `str`
+    """
+    return company_name if user.is_employer else user.get_full_name
+
+
+def register(user, account_type, company_name=None) -> User:
+    """
+    Create the account of a new user
+
+    @type user: `User`  
+    @param user: the unsaved user, with its password already set
+    @param account_type: `student` or `employer`
+    @type account_type: `str`
+    @param company_name: the employer's company
+    @type company_name: `str`
+    @rtype: `User`  
+    @return: the saved user, with its profile
+    """
+    user.is_employer = account_type == 'employer'
+    user.is_student = not user.is_employer
+    # tells the signals the profile and the slug are done here
+    user.registering = True
+
+    try:
+        with transaction.atomic():
+            user.slug = unique_slug(user, profile_name(user, company_name))
+            user.save()
+            if user.is_employer:
+                profile = EmployerProfile(user=user, company_name=company_name)
+            else:
+                profile = StudentProfile(user=user)
+            # the profile's primary key is the user, without `force_insert` it would try an UPDATE first
+            profile.save(force_insert=True)
+    finally:
+        # later saves of the profile slug the user as usual
+        del user.registering
+    return user
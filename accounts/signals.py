@@ -1,12 +1,13 @@
 from django.dispatch import receiver
 from django.db import models
 
+from .counters import increment_counters, reset_counters
 from .models import User, StudentProfile, EmployerProfile
 
 
 """
 Signals for the accounts application  
-Currently we support the following 6 signals:
+Currently we support the following 8 signals:
 
 1. **`create_profile`** - creates profile for a certian user
 2. **`slug_employer`** - slugifies a employer user
@@ -14,6 +15,10 @@ Currently we support the following 6 signals:
 4. **`delete_employer_user`** - delete related user upon employer profile delete
 5. **`delete_student_user`** - delete related user upon student profile delete
 6. **`delete_profile`** - delete related profile upon user delete
+7. **`count_user`** - adds a new user to the homepage counters
+8. **`uncount_user`** - removes a deleted user from the homepage counters
+
+The profile and slug signals skip users created by `accounts.registration.register`, which does both itself
 
 """
 
@@ -22,7 +27,7 @@ Currently we support the following 6 signals:
 def create_profile(sender, instance, created, **kwargs):
     """Signal receiver that creates and attached a profile to a newly created user instance"""
 
-    if created:
+    if created and not getattr(instance, 'registering', False):
         if instance.is_student:
             StudentProfile.objects.create(user=instance)
             instance.save()
@@ -34,16 +39,24 @@ def create_profile(sender, instance, created, **kwargs):
 def slug_employer(sender, instance, created, **kwargs):
     """Signal receiver that slugifies a user employer instance"""
 
+    if getattr(instance.user, 'registering', False):
+        return
+    slug = instance.user.slug
     instance.slug_employer()
-    instance.user.save()
+    if instance.user.slug != slug:
+        instance.user.save(update_fields=['slug'])
 
 
 @receiver(models.signals.post_save, sender=StudentProfile)
 def slug_student(sender, instance, created, **kwargs):
     """Signal receiver that slugifies a user student instance"""
 
+    if getattr(instance.user, 'registering', False):
+        return
+    slug = instance.user.slug
     instance.slug_student()
-    instance.user.save()
+    if instance.user.slug != slug:
+        instance.user.save(update_fields=['slug'])
 
 
 @receiver(models.signals.post_delete, sender=EmployerProfile)
@@ -57,3 +70,15 @@ def delete_student_user(sender, instance, **kwargs):
     """Delete related user instance when student profile instance is deleted"""
     instance.user.delete()
 
+
+@receiver(models.signals.post_save, sender=User)
+def count_user(sender, instance, created, **kwargs):
+    """Add a new user to the cached homepage counters"""
+    if created:
+        increment_counters(instance)
+
+
+@receiver(models.signals.post_delete, sender=User)
+def uncount_user(sender, instance, **kwargs):
+    """Remove a deleted user from the cached homepage counters"""
+    reset_counters(instance)
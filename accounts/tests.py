@@ -1,11 +1,14 @@
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
 from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
 from datetime import date
 from django.core.exceptions import ObjectDoesNotExist
 
 from mixins.init_accounts import InitAccountsMixin
 from .models import *
+from helpers.slugs import unique_slug
+from .registration import register
 
 """
 Tests for the accounts application
@@ -287,3 +290,96 @@ class UserTestCase(TestCase, InitAccountsMixin):
         self.assertEqual(True, User._meta.get_field('profile_picture').null)
         self.assertEqual(True, User._meta.get_field('profile_picture').blank)
         self.assertEqual('profile_pictures', User._meta.get_field('profile_picture').upload_to)
+
+
+class RegistrationTestCase(TestCase, InitAccountsMixin):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().set_up()
+
+    @staticmethod
+    def new_user(email='new@gmail.com'):
+        user = User(email=email, first_name='first', last_name='last')
+        user.set_password('password')
+        return user
+
+    def test_register_student(self):
+        user = register(self.new_user(), 'student')
+        user = User.objects.get(id=user.id)
+        self.assertTrue(user.is_student)
+        self.assertFalse(user.is_employer)
+        self.assertTrue(StudentProfile.objects.filter(user=user).exists())
+        self.assertFalse(EmployerProfile.objects.filter(user=user).exists())
+        # the student from `set_up` already has the slug first-last
+        self.assertEqual(user.slug, 'first-last-2')
+        self.assertTrue(user.check_password('password'))
+
+    def test_register_employer(self):
+        user = register(self.new_user(), 'employer', 'Some Company')
+        user = User.objects.get(id=user.id)
+        self.assertTrue(user.is_employer)
+        self.assertFalse(user.is_student)
+        self.assertEqual(user.employer_profile.company_name, 'Some Company')
+        self.assertFalse(StudentProfile.objects.filter(user=user).exists())
+        self.assertEqual(user.slug, 'some-company-2')
+
+    def test_register_writes(self):
+        with CaptureQueriesContext(connection) as queries:
+            register(self.new_user(), 'student')
+        writes = [query['sql'] for query in queries.captured_queries
+                  if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertEqual(len(writes), 2)
+        self.assertTrue(writes[0].startswith('INSERT INTO "accounts_user"'))
+        self.assertTrue(writes[1].startswith('INSERT INTO "accounts_studentprofile"'))
+        # the slug is allocated with one query
+        self.assertEqual(len([query for query in queries.captured_queries
+                              if '"accounts_user"."slug"' in query['sql']]), 1)
+
+    def test_register_profile_save_slugs(self):
+        user = register(self.new_user(), 'employer', 'Some Company')
+        user.employer_profile.company_name = 'Another Company'
+        user.employer_profile.save()
+        self.assertEqual(User.objects.get(id=user.id).slug, 'another-company')
+
+    def test_register_rolls_back(self):
+        user = self.new_user(email=self.student_email)
+        self.assertRaises(IntegrityError, register, user, 'student')
+        self.assertEqual(User.objects.filter(email=self.student_email).count(), 1)
+
+
+class SlugTestCase(TestCase, InitAccountsMixin):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().set_up()
+
+    def test_slug_kept_when_name_unchanged(self):
+        profile = StudentProfile.objects.get(user=self.student)
+        slug = profile.user.slug
+        with CaptureQueriesContext(connection) as queries:
+            profile.save()
+        self.assertEqual(User.objects.get(id=self.student.id).slug, slug)
+        self.assertFalse([query for query in queries.captured_queries if 'accounts_user' in query['sql']])
+
+    def test_slug_changes_with_name(self):
+        profile = EmployerProfile.objects.get(user=self.employer)
+        profile.company_name = 'Another Company'
+        profile.save()
+        self.assertEqual(User.objects.get(id=self.employer.id).slug, 'another-company')
+
+    def test_unique_slug_one_query(self):
+        # the student from `set_up` has the slug first-last
+        User.objects.filter(id=self.employer.id).update(slug='first-last-2')
+        user = User(email='new@gmail.com', first_name='first', last_name='last')
+        with CaptureQueriesContext(connection) as queries:
+            slug = unique_slug(user, user.get_full_name)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(slug, 'first-last-3')
+
+    def test_unique_slug_kept(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(unique_slug(self.student, 'first last'), self.student.slug)
+            self.assertEqual(unique_slug(self.student, 'First Last!'), self.student.slug)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(unique_slug(self.student, 'another name'), 'another-name')
@@ -0,0 +1,71 @@
+from collections import defaultdict
+
+from django.db.models import Count, F, OuterRef, Q, Subquery
+
+from marketplace.models import Application, ListingSummary
+
+
+"""
+The employer dashboard, every listing with its applications in one of the sections
+(applications, acceptances...), the number of them and a preview of the first few students.  
+A section is built with two queries no matter how many listings the employer has:
+the listings annotated with the count (read from the `ListingSummary` when nothing is archived from the section),
+and the preview applications for every listing.
+"""
+
+# the statuses in every section, and whose archived flag hides an application from it
+SECTIONS = {
+    'applications': (Application.OPEN, None),
+    'acceptances': ((Application.ACCEPTED,), 'employer'),
+    'rejections': ((Application.REJECTED,), 'employer'),
+    'interview_requests': ((Application.INTERVIEW,), 'employer'),
+    'awaiting_confirm': ((Application.AWAITING,), None),
+}
+
+PREVIEW = 3
+
+
+def _section_filter(section, prefix='') -> Q:
+    statuses, archived_by = SECTIONS[section]
+    query = Q(**{f'{prefix}status__in': statuses})
+    if archived_by is not None:
+        query &= Q(**{f'{prefix}{archived_by}_archived': False})
+    return query
+
+
+def employer_dashboard(employer, section, preview=PREVIEW) -> list:
+    """
+    Build a section of the employer dashboard
+
+    @type employer: `User`  
+    @param employer: the employer the dashboard is for  
+    @type section: `str`  
+    @param section: one of `SECTIONS`  
+    @type preview: `int`  
+    @param preview: the number of students to preview for every listing  
+    @rtype: `list`  
+    @return: the employer's listings with applications in the section, each with the number of them
+    as `section_count` and the first `preview` students as `preview`
+    """
+    statuses, archived_by = SECTIONS[section]
+    if archived_by is None:
+        # nothing is archived from the section, so the summary has the counts
+        count = sum((F(f'summary__{ListingSummary.FIELDS[status]}') for status in statuses[1:]),
+                    F(f'summary__{ListingSummary.FIELDS[statuses[0]]}'))
+    else:
+        count = Count('application', filter=_section_filter(section, 'application__'))
+    listings = list(employer.listing.annotate(section_count=count).filter(section_count__gt=0))
+    if not listings:
+        return listings
+
+    first = (Application.objects.filter(_section_filter(section), listing=OuterRef('listing'))
+             .order_by('created', 'id').values('id')[:preview])
+    applications = (Application.objects.filter(listing__in=listings, id__in=Subquery(first))
+                    .select_related('student').order_by('created', 'id'))
+
+    students = defaultdict(list)
+    for application in applications:
+        students[application.listing_id].append(application.student)
+    for listing in listings:
+        listing.preview = students[listing.id]
+    return listings
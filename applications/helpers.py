@@ -1,6 +1,6 @@
 import os
 
-from helpers.email import send_email, send_email_thread
+from helpers.email import send_email, send_email_thread, send_emails
 
 
 """
@@ -30,13 +30,16 @@ From, the Interniac Team
 
     @staticmethod
     def request_interview_email(student, listing) -> None:
-        email = student.email
+        RequestInterview.request_interview_emails([student], listing)
+
+    @staticmethod
+    def request_interview_emails(students, listing) -> None:
         message = RequestInterview.request_interview_msg(
             listing.company, listing.title)
 
-        send_email(body=message, from_email=os.environ.get("EMAIL"),
-                   to=[email], subject=f"Next steps for {listing.title}",
-                   reply_to=[listing.company.email])
+        send_emails([dict(body=message, from_email=os.environ.get("EMAIL"),
+                          to=[student.email], subject=f"Next steps for {listing.title}",
+                          reply_to=[listing.company.email]) for student in students])
 
 
 class RejectStudent:
@@ -53,14 +56,16 @@ From, the Interniac Team
 
     @staticmethod
     def reject_student_email(student, listing):
-        email = student.email
+        RejectStudent.reject_student_emails([student], listing)
 
+    @staticmethod
+    def reject_student_emails(students, listing):
         message = RejectStudent.reject_student_msg(
             listing.company, listing.title)
 
-        send_email(body=message, from_email=os.environ.get("EMAIL"),
-                   to=[email], subject=f"Response for {listing.title}",
-                   reply_to=[listing.company.email])
+        send_emails([dict(body=message, from_email=os.environ.get("EMAIL"),
+                          to=[student.email], subject=f"Response for {listing.title}",
+                          reply_to=[listing.company.email]) for student in students])
 
 
 class AcceptStudent:
@@ -76,13 +81,16 @@ From, the Interniac Team
 
     @staticmethod
     def accept_student_email(student, listing):
+        AcceptStudent.accept_student_emails([student], listing)
+
+    @staticmethod
+    def accept_student_emails(students, listing):
         message = AcceptStudent.accept_student_msg(
             listing.company, listing.title)
 
-        send_email(body=message, from_email=os.environ.get("EMAIL"),
-                   to=[
-                       student.email], subject=f"Congratulations! ({listing.title})",
-                   reply_to=[listing.company.email])
+        send_emails([dict(body=message, from_email=os.environ.get("EMAIL"),
+                          to=[student.email], subject=f"Congratulations! ({listing.title})",
+                          reply_to=[listing.company.email]) for student in students])
 
 
 class ConfirmAcceptance:
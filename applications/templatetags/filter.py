@@ -4,21 +4,20 @@ from django import template
 Custom template tags for the applications app  
 Currently we support the following tag:
 
-1. **filter_from_notif** - filter unread notifications by a certian listing
+1. **count_for** - look up a listing's count in a `dict` of counts by listing id
 """
 
 register = template.Library()
 
 
 @register.filter
-def filter_from_notif(listing, user):
+def count_for(counts, listing):
     """
-    filters the current user's unread notifications by a certian listing  
+    looks up a listing in counts built for all listings at once, like `unread_counts`  
 
+    @type counts - `dict`  
+    @param counts - counts by listing id  
     @type listing - `Listing`  
-    @param listing - listing to show notifications for  
-    @type user: `User``  
-    @param user - the current user
+    @param listing - the listing to get the count for
     """
-    notifs = user.notifications.unread()
-    return notifs.filter(actor_object_id=listing.id)
+    return counts.get(listing.id, 0)
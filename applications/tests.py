@@ -1,14 +1,26 @@
+from datetime import timedelta
+from unittest import mock
+
+from notifications.models import Notification
+
+from django.contrib.contenttypes.models import ContentType
 from django.http import HttpResponse
 from django.utils import timezone
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
 
 from accounts.models import User
-from marketplace.models import Listing, Career
+from marketplace.models import Listing, Career, Application, ApplicationEvent, ListingSummary
+from marketplace.notifications import unread_counts
 from mixins.init_accounts import InitAccountsMixin
+from outbox.models import OutboxEmail
 
 
+@override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_RAISE=True)
 class ApplicationsTestCase(TestCase, InitAccountsMixin):
     """
     Prolly not gonna document these for a while.  
@@ -101,6 +113,68 @@ class ApplicationsTestCase(TestCase, InitAccountsMixin):
         response = self.client.get(path)
         self.assertEqual(response.status_code, 200)
 
+    def test_employer_notification_counts(self):
+        other = self.create_rand_listing()
+        self.login_apply_out()
+        self.listing.apply(self.student)
+        other.apply(self.student)
+        self.assertEqual(self.employer.notifications.unread().count(), 2)
+        self.assertEqual(unread_counts(self.employer), {self.listing.id: 1, other.id: 1})
+
+        # a notification from another model with the same id as a listing
+        Notification.objects.create(recipient=self.employer, verb='other', actor_object_id=self.listing.id,
+                                    actor_content_type=ContentType.objects.get_for_model(self.student))
+        self.assertEqual(unread_counts(self.employer), {self.listing.id: 1, other.id: 1})
+
+        self.login(self.employer)
+        response = self.client.get(reverse('applications'))
+        self.assertEqual(response.context['notification_counts'], {self.listing.id: 1, other.id: 1})
+
+    def create_applicants(self, listing, count) -> list:
+        students = []
+        for i in range(count):
+            student = User.objects.create_user(email=f'{listing.id}-{i}@test.com', first_name='first',
+                                               last_name=f'last {i}', password='password',
+                                               is_student=True, is_employer=False)
+            listing.apply(student)
+            students.append(student)
+        return students
+
+    def dashboard_queries(self, path) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_employer_dashboard(self):
+        students = self.create_applicants(self.listing, 5)
+        other = self.create_rand_listing()
+        self.create_applicants(other, 1)
+        self.create_rand_listing()
+        self.listing.accept(students[0])
+        self.listing.reject(students[1].id)
+
+        self.login(self.employer)
+        dashboard = self.client.get(reverse('applications')).context['dashboard']
+        self.assertEqual([(listing.id, listing.section_count) for listing in dashboard],
+                         [(self.listing.id, 3), (other.id, 1)])
+        self.assertEqual(dashboard[0].preview, students[2:5])
+
+        dashboard = self.client.get(reverse('rejections')).context['dashboard']
+        self.assertEqual([(listing.id, listing.section_count, listing.preview) for listing in dashboard],
+                         [(self.listing.id, 1, [students[1]])])
+
+    def test_employer_dashboard_queries(self):
+        self.create_applicants(self.listing, 4)
+        self.login(self.employer)
+        paths = [reverse(name) for name in
+                 ('applications', 'acceptances', 'rejections', 'interview_requests', 'awaiting_confirm')]
+        queries = [self.dashboard_queries(path) for path in paths]
+
+        for _ in range(5):
+            self.create_applicants(self.create_rand_listing(), 4)
+        self.assertEqual([self.dashboard_queries(path) for path in paths], queries)
+
     def test_student_applications(self):
         path = reverse('applications')
         self.login(self.student)
@@ -364,6 +438,155 @@ class ApplicationsTestCase(TestCase, InitAccountsMixin):
         self.assertTrue(self.student in self.listing.rejections.all())
         self.assertFalse(self.student in self.listing.applications.all())
 
+    def test_application_events(self):
+        self.login_apply_out()
+        self.login(self.employer)
+        self.client.post(reverse('request_interview', kwargs={'listing_id': self.listing.id,
+                                                              'student_id': self.student.id}))
+        self.accept_student()
+        self.logout()
+        self.login(self.student)
+        self.confirm_acceptance()
+
+        events = ApplicationEvent.objects.history(self.listing, self.student)
+        self.assertEqual([(event.transition, event.from_status, event.to_status, event.actor) for event in events], [
+            ('apply', None, Application.APPLIED, self.student),
+            ('request_interview', Application.APPLIED, Application.INTERVIEW, self.employer),
+            ('accept', Application.INTERVIEW, Application.AWAITING, self.employer),
+            ('confirm', Application.AWAITING, Application.ACCEPTED, self.student),
+        ])
+
+        self.assertEqual(ApplicationEvent.objects.metrics()['accept']['count'], 1)
+        with self.assertRaises(ValueError):
+            events[0].save()
+
+    def test_application_event_metrics(self):
+        students = self.create_applicants(self.listing, 2)
+        # both applications were in `Applied` for an hour and two hours
+        now = timezone.now()
+        for student, hours in zip(students, (1, 2)):
+            Application.objects.filter(listing=self.listing, student=student).update(
+                updated=now - timedelta(hours=hours))
+
+        # each transition takes 250ms
+        clock = iter([0, 0.25, 10, 10.25])
+        with mock.patch('marketplace.models.timezone.now', return_value=now), \
+                mock.patch('marketplace.models.perf_counter', lambda: next(clock)):
+            for student in students:
+                self.listing.request_interview(student)
+
+        metrics = ApplicationEvent.objects.metrics()['request_interview']
+        self.assertEqual(metrics['count'], 2)
+        self.assertEqual((metrics['average_latency'], metrics['max_latency']),
+                         (timedelta(milliseconds=250), timedelta(milliseconds=250)))
+        self.assertEqual((metrics['average_dwell'], metrics['max_dwell']),
+                         (timedelta(hours=1, minutes=30), timedelta(hours=2)))
+
+    def test_listing_summary(self):
+        students = self.create_applicants(self.listing, 4)
+        self.listing.request_interview(students[0])
+        self.listing.accept(students[1])
+        self.listing.bulk_reject([students[2].id, students[3].id])
+        self.listing.unapply(students[2])
+        self.listing.confirm_acceptance(students[1])
+
+        summary = ListingSummary.objects.get(listing=self.listing)
+        self.assertEqual((summary.applied, summary.interviewing, summary.awaiting, summary.accepted, summary.rejected),
+                         (0, 1, 0, 1, 2))
+        self.assertEqual(summary.last_activity, self.listing.application_set.latest('updated').updated)
+
+        fresh = ListingSummary.refresh(self.listing.id)
+        self.assertEqual((fresh.applied, fresh.interviewing, fresh.awaiting, fresh.accepted, fresh.rejected),
+                         (0, 1, 0, 1, 2))
+
+        self.listing.refresh_from_db()
+        with CaptureQueriesContext(connection) as queries:
+            summary = self.listing.summarize
+        self.assertEqual((summary['applications'], summary['rejections'], summary['interview requests']), (1, 2, 1))
+        self.assertEqual(len([query for query in queries if 'marketplace_application' in query['sql']]), 0)
+
+    def test_listing_summary_created_concurrently(self):
+        self.create_applicants(self.listing, 2)
+        ListingSummary.objects.filter(listing=self.listing).delete()
+        get = QuerySet.get
+
+        def created_meanwhile(queryset, *args, **kwargs):
+            # another refresh inserts the summary after this one found none
+            if queryset.model is ListingSummary and not ListingSummary.objects.filter(listing=self.listing).exists():
+                ListingSummary.objects.create(listing=self.listing)
+                raise ListingSummary.DoesNotExist
+            return get(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'get', created_meanwhile):
+            summary = ListingSummary.refresh(self.listing.id)
+        self.assertEqual(summary.applied, 2)
+        self.assertEqual(ListingSummary.objects.get(listing=self.listing).applied, 2)
+
+    def test_listing_summary_drifted(self):
+        students = self.create_applicants(self.listing, 2)
+        # the counters drifted, e.g. applications were changed by hand
+        ListingSummary.objects.filter(listing=self.listing).update(applied=0)
+        self.listing.request_interview(students[0])
+
+        summary = ListingSummary.objects.get(listing=self.listing)
+        self.assertEqual((summary.applied, summary.interviewing), (0, 1))
+        self.assertEqual(self.listing.status_for(students[0]), Application.INTERVIEW)
+
+    def test_invalid_transition(self):
+        self.login_apply_out()
+        self.listing.reject(self.student)
+        self.listing.request_interview(self.student)
+        self.listing.accept(self.student.id)
+        self.assertEqual(self.listing.status_for(self.student), Application.REJECTED)
+        self.assertEqual(list(ApplicationEvent.objects.values_list('transition', flat=True).order_by('id')),
+                         ['apply', 'reject'])
+
+    def bulk_action(self, action, students) -> HttpResponse:
+        return self.client.post(reverse('bulk_action', kwargs={'listing_id': self.listing.id}),
+                                {'action': action, 'student_ids': [student.id for student in students]})
+
+    def test_employer_bulk_accept(self):
+        students = self.create_applicants(self.listing, 4)
+        self.listing.unapply(students[3])
+        self.login(self.employer)
+        response = self.bulk_action('accept', students)
+        self.assertRedirects(response, reverse('all_applications', kwargs={'slug': self.listing.slug}),
+                             fetch_redirect_response=False)
+        self.assertEqual(list(self.listing.awaiting_confirm_acceptance.order_by('id')), students[:3])
+        self.assertEqual(self.listing.status_for(students[3]), Application.WITHDRAWN)
+        self.assertEqual(sorted(email.to[0] for email in OutboxEmail.objects.all()),
+                         sorted(student.email for student in students[:3]))
+
+    def test_employer_bulk_queries(self):
+        self.login(self.employer)
+        students = self.create_applicants(self.listing, 2)
+        with CaptureQueriesContext(connection) as queries:
+            self.bulk_action('reject', students)
+        few = len(queries)
+        self.listing = self.create_rand_listing()
+        students = self.create_applicants(self.listing, 10)
+        with CaptureQueriesContext(connection) as queries:
+            self.bulk_action('reject', students)
+        self.assertEqual(len(queries), few)
+
+    def test_employer_bulk_request_interview(self):
+        students = self.create_applicants(self.listing, 2)
+        self.listing.reject(students[1].id)
+        self.login(self.employer)
+        self.bulk_action('request_interview', students)
+        self.assertEqual(list(self.listing.interview_requests), [students[0]])
+        self.assertEqual(self.listing.status_for(students[1]), Application.REJECTED)
+
+    def test_rand_employer_bulk_action(self):
+        students = self.create_applicants(self.listing, 2)
+        self.login(self.rand_employer)
+        self.assertEqual(self.bulk_action('reject', students).status_code, 403)
+        self.assertFalse(self.listing.rejections.exists())
+
+    def test_employer_bulk_unknown_action(self):
+        self.login(self.employer)
+        self.assertEqual(self.bulk_action('delete', []).status_code, 400)
+
     # try to reject a student as a student
     def test_student_reject(self):
         self.login_apply_out()
@@ -418,6 +641,24 @@ class ApplicationsTestCase(TestCase, InitAccountsMixin):
         self.assertFalse(
             self.student in new_listing.awaiting_confirm_acceptance.all())
 
+    def test_confirm_acceptance_withdraws_other_offers(self):
+        other = self.create_rand_listing()
+        applied = self.create_rand_listing()
+        for listing in (self.listing, other, applied):
+            listing.apply(self.student)
+        self.listing.accept(self.student)
+        other.accept(self.student)
+
+        self.assertTrue(self.listing.confirm_acceptance(self.student))
+        self.assertEqual(self.listing.status_for(self.student), Application.ACCEPTED)
+        self.assertEqual(other.status_for(self.student), Application.WITHDRAWN)
+        self.assertEqual(applied.status_for(self.student), Application.WITHDRAWN)
+
+        # the other offer was withdrawn, it can't be confirmed anymore
+        self.assertFalse(other.confirm_acceptance(self.student))
+        self.assertEqual(self.listing.status_for(self.student), Application.ACCEPTED)
+        self.assertEqual(other.status_for(self.student), Application.WITHDRAWN)
+
     # test that previous applications will be withdrawn upon accepting an internship
     def test_student_withdraw_application(self):
         self.apply_accept_login()
@@ -469,6 +710,14 @@ class ApplicationsTestCase(TestCase, InitAccountsMixin):
         self.assertTrue(
             self.student in self.listing.awaiting_confirm_acceptance.all())
 
+    def test_employer_accept_enqueues_email(self):
+        self.login_apply_out()
+        self.login(self.employer)
+        self.accept_student()
+        email = OutboxEmail.objects.get(to=[self.student.email])
+        self.assertEqual(email.subject, f'Congratulations! ({self.listing.title})')
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+
     # try to accept a student as a student
     def test_student_accept(self):
         self.login_apply_out()
@@ -512,3 +761,42 @@ class ApplicationsTestCase(TestCase, InitAccountsMixin):
         self.login(self.employer)
         response = self.client.get(path)
         self.assertEqual(response.status_code, 403)
+
+    def test_apply_twice_single_application(self):
+        self.login(self.student)
+        self.apply()
+        self.apply()
+        self.assertEqual(Application.objects.filter(listing=self.listing, student=self.student).count(), 1)
+
+    def test_unapply_already_applied(self):
+        self.login(self.student)
+        self.apply()
+        self.client.get(reverse('unapply', kwargs={'listing_id': self.listing.id}))
+        self.assertFalse(self.student in self.listing.applications.all())
+        self.assertTrue(self.listing.has_student_already_applied(self.student))
+
+    def test_employer_accept_after_interview_request(self):
+        self.login_apply_out()
+        self.login(self.employer)
+        self.client.get(reverse('request_interview', kwargs={
+            'listing_id': self.listing.id,
+            'student_id': self.student.id
+        }))
+        self.accept_student()
+        application = Application.objects.get(listing=self.listing, student=self.student)
+        self.assertEqual(application.status, Application.AWAITING)
+        self.assertFalse(self.student in self.listing.interview_requests.all())
+        self.assertFalse(self.student in self.listing.applications.all())
+
+    def test_listing_status_for(self):
+        self.assertIsNone(self.listing.status_for(self.student))
+        self.login_apply_out()
+        self.assertEqual(self.listing.status_for(self.student), Application.APPLIED)
+        self.assertTrue(self.listing.has_applicant(self.student, [Application.APPLIED]))
+        self.assertFalse(self.listing.has_applicant(self.student, [Application.AWAITING]))
+
+    def test_view_listing_status(self):
+        self.login_apply_out()
+        self.login(self.student)
+        response = self.client.get(reverse('listing', kwargs={'slug': self.listing.slug}))
+        self.assertEqual(response.context['status'], Application.APPLIED)
@@ -11,6 +11,7 @@ urlpatterns = [
          reject_and_email, name='reject'),
     path('request_interview/<int:listing_id>/<int:student_id>',
          request_interview_and_email, name='request_interview'),
+    path('bulk/<int:listing_id>', bulk_action_and_email, name='bulk_action'),
     path('application/<slug:listing_slug>/<slug:user_slug>',
          SingleApplication.as_view(), name='single_application'),
     path('acceptances', Acceptances.as_view(), name='acceptances'),
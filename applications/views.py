@@ -1,15 +1,19 @@
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest
 from django.shortcuts import render, redirect
 from django.urls import reverse_lazy, reverse
+from django.views.decorators.http import require_POST
 from django.views.generic import TemplateView, RedirectView
 from django.core.exceptions import PermissionDenied
+from django.db import transaction
 
 from accounts.models import User
 from decorators.student_required import student_required
 from decorators.employer_required import employer_required
 from marketplace.models import Listing
+from marketplace.notifications import unread_counts
+from mixins.employer_dashboard import EmployerDashboardMixin
 from mixins.employer_required import EmployerRequiredMixin
 from mixins.student_required import StudentRequiredMixin
 from .helpers import *
@@ -27,10 +31,11 @@ def apply_and_email(request, listing_id):
     """
     listing = Listing.objects.get(id=listing_id)
 
-    if not listing.has_student_already_applied(request.user):
-        Applied.applied_email(request.user, listing)
+    with transaction.atomic():
+        if not listing.has_student_already_applied(request.user):
+            Applied.applied_email(request.user, listing)
 
-    listing.apply(request.user)
+        listing.apply(request.user)
     redirect_where = request.GET.get('redirect')
     if redirect_where == 'profile':
         return redirect(request.user)
@@ -78,8 +83,9 @@ def accept_and_email(request, listing_id, student_id):
         raise PermissionDenied
 
     student = User.objects.get(id=student_id)
-    listing.accept(student)
-    AcceptStudent.accept_student_email(student, listing)
+    with transaction.atomic():
+        listing.accept(student)
+        AcceptStudent.accept_student_email(student, listing)
     return render(request, 'success-error/success-accepted-student.html',
                   context={'first': student.first_name, 'last': student.last_name, 'listing_title': listing.title})
 
@@ -100,8 +106,9 @@ def reject_and_email(request, listing_id, student_id):
         raise PermissionDenied
 
     student = User.objects.get(id=student_id)
-    listing.reject(student_id)
-    RejectStudent.reject_student_email(student, listing)
+    with transaction.atomic():
+        listing.reject(student_id)
+        RejectStudent.reject_student_email(student, listing)
     return render(request, 'success-error/success-rejected-student.html',
                   context={'first': student.first_name, 'last': student.last_name, 'listing_title': listing.title})
 
@@ -123,12 +130,50 @@ def request_interview_and_email(request, listing_id, student_id):
         raise PermissionDenied
 
     student = User.objects.get(id=student_id)
-    listing.request_interview(student_id)
-    RequestInterview.request_interview_email(student, listing)
+    with transaction.atomic():
+        listing.request_interview(student_id)
+        RequestInterview.request_interview_email(student, listing)
     return render(request, 'success-error/success-requested-interview.html',
                   context={'first': student.first_name, 'last': student.last_name, 'listing_title': listing.title})
 
 
+# the transition and the email for every bulk action
+BULK_ACTIONS = {
+    'accept': (Listing.bulk_accept, AcceptStudent.accept_student_emails),
+    'reject': (Listing.bulk_reject, RejectStudent.reject_student_emails),
+    'request_interview': (Listing.bulk_request_interview, RequestInterview.request_interview_emails),
+}
+
+
+@login_required
+@employer_required
+@require_POST
+def bulk_action_and_email(request, listing_id):
+    """
+    This function based view accepts, rejects or requests interviews from many applicants at once
+    and emails them. Students whose application can't make the transition are skipped  
+
+    The action (`accept`, `reject` or `request_interview`) and the `student_ids` are posted  
+
+    @param listing_id: the id of the listing that the applicants applied to  
+    @type listing_id: `int`  
+    """
+    listing = Listing.objects.select_related('company__employer_profile').get(id=listing_id)
+
+    if request.user != listing.company:
+        raise PermissionDenied
+
+    if request.POST.get('action') not in BULK_ACTIONS:
+        return HttpResponseBadRequest('Unknown action')
+    transition, email = BULK_ACTIONS[request.POST['action']]
+    student_ids = [int(student_id) for student_id in request.POST.getlist('student_ids') if student_id.isdigit()]
+
+    with transaction.atomic():
+        updated = transition(listing, student_ids)
+        email(User.objects.filter(id__in=updated).only('email'), listing)
+    return redirect('all_applications', slug=listing.slug)
+
+
 class SingleApplication(LoginRequiredMixin, TemplateView):
     """
     This class based view allows the listing owner to view an applicants application  
@@ -157,6 +202,7 @@ class SingleApplication(LoginRequiredMixin, TemplateView):
         context = super().get_context_data()
         context['student'] = self.get_student()
         context['listing'] = self.get_listing()
+        context['status'] = context['listing'].status_for(context['student'])
         return context
 
     def get_student(self):
@@ -165,7 +211,7 @@ class SingleApplication(LoginRequiredMixin, TemplateView):
 
         @returns `User` object  
         """
-        return User.objects.get(slug=self.kwargs['user_slug'])
+        return User.objects.with_profiles().get(slug=self.kwargs['user_slug'])
 
     def get_listing(self):
         """
@@ -276,36 +322,40 @@ class AllAwaitingConfirm(EmployerRequiredMixin, TemplateView):
         return context
 
 
-class Acceptances(LoginRequiredMixin, TemplateView):
+class Acceptances(LoginRequiredMixin, EmployerDashboardMixin, TemplateView):
     """
     This class based view renders the acceptances template. May not render all acceptances.  
     """
 
     template_name = 'applications/acceptances.html'
+    dashboard_section = 'acceptances'
 
 
-class Rejections(LoginRequiredMixin, TemplateView):
+class Rejections(LoginRequiredMixin, EmployerDashboardMixin, TemplateView):
     """
     This class based view renders the rejections template. May not render all rejections.  
     """
 
     template_name = 'applications/rejections.html'
+    dashboard_section = 'rejections'
 
 
-class InterviewRequests(LoginRequiredMixin, TemplateView):
+class InterviewRequests(LoginRequiredMixin, EmployerDashboardMixin, TemplateView):
     """
     This class based view renders the interview requests template. May not render all interview requests.  
     """
 
     template_name = 'applications/interview-requests.html'
+    dashboard_section = 'interview_requests'
 
 
-class AwaitingConfirm(TemplateView):
+class AwaitingConfirm(EmployerDashboardMixin, TemplateView):
     """
     This class based view renders the awaiting confirmation template. May not render all applications awaiting confrimation.  
     """
 
     template_name = 'applications/awaiting-confirm.html'
+    dashboard_section = 'awaiting_confirm'
 
 
 class ArchiveAcceptance(LoginRequiredMixin, RedirectView):
@@ -420,8 +470,9 @@ class DeclineAcceptanceAndEmail(RedirectView, StudentRequiredMixin):
         listing = Listing.objects.get(id=self.kwargs.get('listing_id'))
         if not listing.check_if_accepted(self.request.user):
             raise PermissionDenied
-        listing.decline_acceptance(self.request.user)
-        DeclineAcceptance.declined_acceptance_email(self.request.user, listing)
+        with transaction.atomic():
+            listing.decline_acceptance(self.request.user)
+            DeclineAcceptance.declined_acceptance_email(self.request.user, listing)
         return super().get_redirect_url(*args, **kwargs)
 
 
@@ -440,18 +491,26 @@ class ConfirmAcceptanceAndEmail(RedirectView, StudentRequiredMixin):
         listing = Listing.objects.get(id=self.kwargs.get('listing_id'))
         if not listing.check_if_accepted(self.request.user):
             raise PermissionDenied
-        listing.confirm_acceptance(self.request.user)
-        ConfirmAcceptance.confirmed_acceptance_email(
-            self.request.user, listing)
+        with transaction.atomic():
+            if listing.confirm_acceptance(self.request.user):
+                ConfirmAcceptance.confirmed_acceptance_email(
+                    self.request.user, listing)
         return super().get_redirect_url(*args, **kwargs)
 
 
-class Applications(LoginRequiredMixin, TemplateView):
+class Applications(LoginRequiredMixin, EmployerDashboardMixin, TemplateView):
     """
     This class based view renders the applications template.  
     """
 
     template_name = 'applications/applications.html'
+    dashboard_section = 'applications'
+
+    def get_context_data(self, **kwargs):
+        context = super(Applications, self).get_context_data(**kwargs)
+        if self.request.user.is_employer:
+            context['notification_counts'] = unread_counts(self.request.user)
+        return context
 
 
 @login_required
@@ -5,6 +5,7 @@ from django.contrib.auth.forms import UserCreationForm
 from django.core.files.uploadedfile import InMemoryUploadedFile
 
 from accounts.models import User, EmployerProfile
+from accounts.registration import register
 from helpers.profile_img_validation import validate_profile_img
 
 """
@@ -34,21 +35,10 @@ class UserCreateForm(UserCreationForm):
     def save(self, commit=True):
         """
         This method overrides the `UserCreationForm` `save` method. 
-        It preforms actions on the new user instance based on if it's a student or employer account
+        It creates the user and their student or employer profile with `register`, the account is always saved
         """
         user = super(UserCreateForm, self).save(commit=False)
-        if self.cleaned_data.get('student_employer') == 'employer':
-            user.is_employer = True
-            user.is_student = False
-        elif self.cleaned_data.get('student_employer') == 'student':
-            user.is_student = True
-            user.is_employer = False
-        user.save()
-        if user.is_employer:
-            user.employer_profile.company_name = self.cleaned_data.get(
-                'company_name')
-            user.employer_profile.save()
-        return user
+        return register(user, self.cleaned_data.get('student_employer'), self.cleaned_data.get('company_name'))
 
     def clean_profile_picture(self):
         """
@@ -0,0 +1,92 @@
+import json
+import platform
+import random
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from benchmarks.runner import run_scenario, compare
+from benchmarks.scenarios import Data, SCENARIOS
+from benchmarks.seed import seed, seeded, SCALES
+
+BASELINES = Path(__file__).resolve().parent.parent.parent / 'baselines'
+
+
+class Command(BaseCommand):
+    help = ('Seed a test database and time the marketplace and applications pages, '
+            'the results are saved as a JSON baseline and compared with the previous one')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='smoke')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0, help='The seed of the random data and requests')
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                            help='Only run these scenarios, every scenario runs by default')
+        parser.add_argument('--output', help='Where to save the results, benchmarks/baselines/<scale>.json by default')
+        parser.add_argument('--tolerance', type=float,
+                            help='Also fail when the p95 latency is this much slower than the baseline, like 0.2, '
+                                 'only when the baseline was recorded on this machine')
+        parser.add_argument('--update', action='store_true',
+                            help='Save the results even if they regressed, to accept a slower baseline')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the seeded database for the next run instead of seeding it again')
+
+    def handle(self, *args, **options):
+        output = Path(options['output']) if options['output'] else BASELINES / f"{options['scale']}.json"
+        baseline = json.loads(output.read_text()) if output.exists() else None
+
+        # the benchmarks run on their own database like the tests, never on the configured one
+        setup_test_environment()
+        database = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            results = self.run(options)
+        finally:
+            if not options['keepdb']:
+                connection.creation.destroy_test_db(database, verbosity=0)
+            teardown_test_environment()
+
+        tolerance = options['tolerance']
+        if tolerance is not None and baseline and baseline.get('host') != results['host']:
+            self.stdout.write(self.style.WARNING(f'{output} was recorded on another machine, '
+                                                 'only the queries are compared'))
+            tolerance = None
+        regressions = compare(results['scenarios'], baseline['scenarios'], tolerance) if baseline else []
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(regression))
+        if regressions and not options['update']:
+            raise CommandError(f'{len(regressions)} regressions against {output}, run with --update to save them')
+
+        if baseline and options['scenario']:
+            # a partial run keeps the baseline of the scenarios it didn't run
+            results['scenarios'] = {**baseline['scenarios'], **results['scenarios']}
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+        self.stdout.write(f'saved {output}')
+
+    def run(self, options) -> dict:
+        seeding = None
+        if not seeded():
+            seeding = seed(random_seed=options['seed'], **SCALES[options['scale']])
+            self.stdout.write(f"seeded {seeding['rows']} rows in {seeding['seconds']:.1f}s, "
+                              f"{seeding['rows_per_second']:.0f} rows/s")
+
+        rng = random.Random(options['seed'])
+        data = Data(rng, options['iterations'])
+        scenarios = {}
+        for name in options['scenario'] or SCENARIOS:
+            scenarios[name] = stats = run_scenario(SCENARIOS[name], data, options['iterations'])
+            self.stdout.write(f"{name}: p50 {stats['p50']:.1f}ms, p95 {stats['p95']:.1f}ms, "
+                              f"p99 {stats['p99']:.1f}ms, {stats['queries']:.1f} queries, "
+                              f"{stats['requests_per_second']:.0f} requests/s")
+
+        return {
+            'host': platform.node(),
+            'scale': options['scale'],
+            'seed': options['seed'],
+            'iterations': options['iterations'],
+            'seeding': seeding,
+            'scenarios': scenarios,
+        }
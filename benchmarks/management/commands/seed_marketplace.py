@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.seed import seed, seeded, SCALES
+
+
+class Command(BaseCommand):
+    help = ('Fill the database with generated employers, students, listings and applications for staging, '
+            'the rows are inserted in bulk without the per row signals')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='small')
+        for name in ('employers', 'students', 'listings', 'applications'):
+            parser.add_argument(f'--{name}', type=int, help=f'The number of {name}, instead of the scale\'s')
+        parser.add_argument('--seed', type=int, default=0, help='The seed of the random data')
+        parser.add_argument('--password', help='The password of every generated user, they can\'t log in without it')
+        parser.add_argument('--noinput', action='store_false', dest='interactive',
+                            help='Don\'t ask for confirmation')
+
+    def handle(self, *args, **options):
+        if seeded():
+            raise CommandError('The database was already seeded')
+
+        counts = {name: options[name] if options[name] is not None else count
+                  for name, count in SCALES[options['scale']].items()}
+        if options['interactive']:
+            answer = input(f"This adds {counts['employers']} employers, {counts['students']} students, "
+                           f"{counts['listings']} listings and {counts['applications']} applications "
+                           f"to {connection.settings_dict['NAME']}. Type 'yes' to continue: ")
+            if answer != 'yes':
+                raise CommandError('Seeding cancelled')
+
+        results = seed(random_seed=options['seed'], password=options['password'], **counts)
+        self.stdout.write(f"seeded {results['rows']} rows in {results['seconds']:.1f}s, "
+                          f"{results['rows_per_second']:.0f} rows/s")
@@ -0,0 +1,107 @@
+import time
+
+from django.test import Client
+
+from connect_x.query_budget import QueryRecorder
+
+
+"""
+Runs the benchmark scenarios with the Django test client and compares the results with a baseline
+Currently we support the following 3 functions:
+
+1. **`percentile`** - the nearest rank percentile of some measurements
+2. **`run_scenario`** - times the requests of one scenario
+3. **`compare`** - finds the scenarios that run more queries than the baseline, or got slower on the same machine
+"""
+
+WARMUP = 5
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def percentile(values, percent) -> float:
+    """
+    @param values: the measurements
+    @type values: `list`
+    @param percent: the percentile, between 0 and 100
+    @type percent: `int`
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    rank = max(int(round(percent / 100 * len(values))) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def run_scenario(scenario, data, iterations) -> dict:
+    """
+    Request the scenario's page `iterations` times after a few requests to warm up the caches
+
+    @param scenario: a function that picks the user and the path of a request from `data`
+    @type scenario: `function`
+    @type data: `benchmarks.scenarios.Data`
+    @rtype: `dict`
+    @return: the latency percentiles in milliseconds, the queries per request and the requests per second
+    """
+    client = Client()
+    latencies = []
+    queries = []
+    rows = 0
+    for i in range(WARMUP + iterations):
+        user, path = scenario(data)
+        client.force_login(user)
+        with QueryRecorder() as recorder:
+            start = time.perf_counter()
+            response = client.get(path)
+            latency = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise BenchmarkError(f'{path} returned {response.status_code}')
+        if i < WARMUP:
+            continue
+        latencies.append(latency * 1000)
+        queries.append(recorder.count)
+        object_list = response.context.get('object_list') if response.context else None
+        rows += len(object_list) if object_list is not None else 0
+
+    seconds = sum(latencies) / 1000
+    stats = {
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'mean': sum(latencies) / len(latencies),
+        'queries': sum(queries) / len(queries),
+        'requests_per_second': iterations / seconds if seconds else 0,
+        'rows_per_second': rows / seconds if seconds else 0,
+    }
+    # rounded so the baselines diff well in review
+    stats = {name: round(value, 2) for name, value in stats.items()}
+    stats.update({'iterations': iterations, 'max_queries': max(queries)})
+    return stats
+
+
+def compare(results, baseline, tolerance=None) -> list:
+    """
+    Find the regressions between two benchmark runs, a scenario regressed when it runs more queries per request.
+    The latency is only compared with a `tolerance`, milliseconds measured on another machine can't be compared
+
+    @param results: the scenarios of the current run
+    @type results: `dict`
+    @param baseline: the scenarios of the baseline run
+    @type baseline: `dict`
+    @param tolerance: how much slower the p95 latency can be, the latency isn't compared if it's `None`
+    @type tolerance: `float`
+    @rtype: `list`
+    @return: a description of every regression
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if tolerance is not None and 'p95' in previous and current['p95'] > previous['p95'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95']:.1f}ms -> {current['p95']:.1f}ms")
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{name}: {previous['queries']:.1f} -> {current['queries']:.1f} queries per request")
+    return regressions
@@ -0,0 +1,108 @@
+from django.urls import reverse
+
+from accounts.models import User
+from marketplace.models import Listing, Application
+from .runner import WARMUP
+from .seed import WORDS
+
+
+"""
+The requests the benchmarks time
+Every scenario picks a user and a path from the seeded data, the flows that change data (`apply` and `accept`)
+pick a different listing or application every time they run
+
+"""
+
+SAMPLE_SIZE = 200
+
+
+class Data:
+    """
+    A random sample of the seeded users, listings and applications for the scenarios to pick from
+
+    @param rng: the random generator the samples are picked with
+    @type rng: `random.Random`
+    @param iterations: how many times the flows that change data will run
+    @type iterations: `int`
+    """
+
+    def __init__(self, rng, iterations):
+        self.rng = rng
+        self.students = self._sample(User.objects.filter(is_student=True))
+        self.employers = self._sample(User.objects.filter(is_employer=True, listing__isnull=False).distinct())
+        self.listings = self._sample(Listing.objects.all())
+
+        # applications the employer hasn't answered yet, one for every time `accept` runs
+        self.applied = list(Application.objects.filter(status=Application.APPLIED)
+                            .select_related('listing__company', 'student').order_by('id')[:WARMUP + iterations])
+        self.rng.shuffle(self.applied)
+
+    def _sample(self, queryset) -> list:
+        ids = list(queryset.order_by('id').values_list('id', flat=True))
+        ids = self.rng.sample(ids, min(SAMPLE_SIZE, len(ids)))
+        return list(queryset.model.objects.filter(id__in=ids).order_by('id'))
+
+    def student(self) -> User:
+        return self.rng.choice(self.students)
+
+    def employer(self) -> User:
+        return self.rng.choice(self.employers)
+
+    def listing(self) -> Listing:
+        return self.rng.choice(self.listings)
+
+    def word(self) -> str:
+        return self.rng.choice(WORDS)
+
+
+def marketplace(data):
+    return data.student(), reverse('marketplace')
+
+
+def filter_listings(data):
+    return data.student(), reverse('filter') + '?type=paid&where=virtual'
+
+
+def search(data):
+    return data.student(), reverse('filter') + f'?search={data.word()}'
+
+
+def view_listing(data):
+    return data.student(), data.listing().get_absolute_url()
+
+
+def apply(data):
+    return data.student(), reverse('apply', kwargs={'listing_id': data.listing().id})
+
+
+def accept(data):
+    application = data.applied.pop()
+    return application.listing.company, reverse('accept', kwargs={'listing_id': application.listing_id,
+                                                                  'student_id': application.student_id})
+
+
+def employer_applications(data):
+    return data.employer(), reverse('applications')
+
+
+def employer_acceptances(data):
+    return data.employer(), reverse('acceptances')
+
+
+def employer_all_applications(data):
+    employer = data.employer()
+    listing = employer.listing.order_by('id').first()
+    return employer, reverse('all_applications', kwargs={'slug': listing.slug})
+
+
+SCENARIOS = {
+    'marketplace': marketplace,
+    'filter': filter_listings,
+    'search': search,
+    'view_listing': view_listing,
+    'apply': apply,
+    'accept': accept,
+    'employer_applications': employer_applications,
+    'employer_acceptances': employer_acceptances,
+    'employer_all_applications': employer_all_applications,
+}
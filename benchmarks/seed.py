@@ -0,0 +1,190 @@
+import math
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.counters import clear_counters
+from accounts.models import User, StudentProfile, EmployerProfile
+from helpers.slugs import Slugs
+from marketplace.choices import invalidate_choices
+from marketplace.models import Listing, Career, Application, ListingSummary, ListingSearchTerm
+from marketplace.search import listing_terms
+
+
+"""
+Seeds the database the benchmarks run against, and staging
+Every scale is seeded from a random seed, so the same scale and seed always create the same data.
+The rows are inserted with `bulk_create`, so the signals that normally run for every user and listing
+(profiles, slugs, summaries, the search index and the cached counters) are done here in bulk instead
+
+"""
+
+SCALES = {
+    'smoke': {'employers': 10, 'students': 100, 'listings': 50, 'applications': 1000},
+    'small': {'employers': 200, 'students': 4000, 'listings': 1000, 'applications': 40000},
+    'full': {'employers': 10000, 'students': 200000, 'listings': 50000, 'applications': 2000000},
+}
+
+CAREERS = ['Software engineering', 'Marine biology', 'Accounting', 'Graphic design', 'Journalism',
+           'Nursing', 'Architecture', 'Marketing', 'Law', 'Data science']
+
+WORDS = ['python', 'research', 'design', 'analysis', 'writing', 'summer', 'remote', 'lab', 'community',
+         'finance', 'startup', 'hospital', 'museum', 'studio', 'robotics', 'climate', 'media', 'sales']
+
+EMAIL_DOMAIN = 'benchmark.test'
+
+BATCH_SIZE = 5000
+
+
+def _batches(items):
+    for i in range(0, len(items), BATCH_SIZE):
+        yield items[i:i + BATCH_SIZE]
+
+
+def _users(users) -> list:
+    """
+    Insert the users and return their ids in the same order, the ids are read back by email because
+    SQLite doesn't return them from `bulk_create`
+    """
+    ids = []
+    for batch in _batches(users):
+        User.objects.bulk_create(batch)
+        emails = dict(User.objects.filter(email__in=[user.email for user in batch]).values_list('email', 'id'))
+        ids.extend(emails[user.email] for user in batch)
+    return ids
+
+
+def _employers(count, password, slugs, rng) -> list:
+    names = [f'{rng.choice(WORDS).title()} {i}' for i in range(count)]
+    ids = _users([User(email=f'employer{i}@{EMAIL_DOMAIN}', first_name='employer', last_name=str(i),
+                       password=password, is_employer=True, is_student=False, slug=slugs.allocate(name))
+                  for i, name in enumerate(names)])
+    EmployerProfile.objects.bulk_create([EmployerProfile(user_id=user_id, company_name=name)
+                                         for user_id, name in zip(ids, names)], batch_size=BATCH_SIZE)
+    return list(zip(ids, names))
+
+
+def _students(count, password, slugs) -> list:
+    ids = _users([User(email=f'student{i}@{EMAIL_DOMAIN}', first_name='student', last_name=str(i),
+                       password=password, is_student=True, is_employer=False, slug=slugs.allocate(f'student {i}'))
+                  for i in range(count)])
+    StudentProfile.objects.bulk_create([StudentProfile(user_id=user_id) for user_id in ids], batch_size=BATCH_SIZE)
+    return ids
+
+
+def _listings(count, employers, careers, rng) -> list:
+    now = timezone.now()
+    slugs = Slugs(Listing)
+    listings = []
+    for _ in range(count):
+        title = ' '.join(rng.sample(WORDS, 3))[:50]
+        listings.append(Listing(
+            company_id=rng.choice(employers)[0], title=title, slug=slugs.allocate(title),
+            type=rng.choice(['Paid', 'Unpaid']), where=rng.choice(['Virtual', 'In-Person']),
+            career=rng.choice(careers), time_commitment='10 hours a week',
+            application_deadline=now + timedelta(days=rng.randint(1, 90)),
+            description=' '.join(rng.choice(WORDS) for _ in range(40)),
+            posted=(now - timedelta(days=rng.randint(0, 365))).date()))
+
+    for batch in _batches(listings):
+        Listing.objects.bulk_create(batch)
+        ids = dict(Listing.objects.filter(slug__in=[listing.slug for listing in batch]).values_list('slug', 'id'))
+        for listing in batch:
+            listing.id = ids[listing.slug]
+    return listings
+
+
+def _search_terms(listings, employers) -> int:
+    company_names = dict(employers)
+    terms = []
+    for listing in listings:
+        weights = listing_terms(listing.title, listing.description, listing.career.career,
+                                company_names[listing.company_id])
+        terms.extend(ListingSearchTerm(listing_id=listing.id, term=term, weight=weight)
+                     for term, weight in weights.items())
+    ListingSearchTerm.objects.bulk_create(terms, batch_size=BATCH_SIZE)
+    return len(terms)
+
+
+def _applications(count, listings, student_ids, summaries, rng) -> int:
+    """
+    Insert the applications one batch at a time, a student applies to a listing at most once.
+    The pairs of listings and students are picked by walking every pair with a random step that's coprime with
+    the number of pairs, so no pair is picked twice without keeping the pairs already picked in memory
+
+    @param summaries: the summary of every listing, counted here
+    @type summaries: `dict`
+    @rtype: `int`
+    @return: the number of applications
+    """
+    statuses = [Application.APPLIED] * 6 + [Application.INTERVIEW, Application.AWAITING, Application.ACCEPTED,
+                                            Application.REJECTED]
+    listing_ids = [listing.id for listing in listings]
+    pairs = len(listing_ids) * len(student_ids)
+    count = min(count, pairs)
+    if not count:
+        return 0
+    step = rng.randrange(1, pairs) if pairs > 1 else 1
+    while math.gcd(step, pairs) != 1:
+        step = rng.randrange(1, pairs)
+    pair = rng.randrange(pairs)
+
+    for start in range(0, count, BATCH_SIZE):
+        batch = []
+        for _ in range(min(BATCH_SIZE, count - start)):
+            listing_id, student_id = listing_ids[pair // len(student_ids)], student_ids[pair % len(student_ids)]
+            batch.append(Application(listing_id=listing_id, student_id=student_id, status=rng.choice(statuses)))
+            field = ListingSummary.FIELDS.get(batch[-1].status)
+            if field:
+                summary = summaries[listing_id]
+                setattr(summary, field, getattr(summary, field) + 1)
+            pair = (pair + step) % pairs
+        Application.objects.bulk_create(batch)
+    return count
+
+
+def seeded() -> bool:
+    """
+    If the database was already seeded
+    """
+    return User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').exists()
+
+
+def seed(employers, students, listings, applications, random_seed=0, password=None) -> dict:
+    """
+    Create the employers, students, listings and applications the benchmarks use
+
+    @param random_seed: the seed of the random data, the same seed creates the same data
+    @type random_seed: `int`
+    @param password: the password of every seeded user, they can't log in with a password if it's `None`
+    @type password: `str`
+    @rtype: `dict`
+    @return: the number of `rows` created, how long it took in `seconds` and the `rows_per_second`
+    """
+    rng = random.Random(random_seed)
+    start = time.monotonic()
+    # hashing a password is slow on purpose, every user gets the same hash
+    password = make_password(password)
+    rows = 0
+    with transaction.atomic():
+        careers = [Career.objects.get_or_create(career=career)[0] for career in CAREERS]
+        slugs = Slugs(User)
+        employer_rows = _employers(employers, password, slugs, rng)
+        student_ids = _students(students, password, slugs)
+        listing_rows = _listings(listings, employer_rows, careers, rng)
+        summaries = {listing.id: ListingSummary(listing_id=listing.id) for listing in listing_rows}
+        application_count = _applications(applications, listing_rows, student_ids, summaries, rng)
+        ListingSummary.objects.bulk_create(summaries.values(), batch_size=BATCH_SIZE)
+        rows += 2 * (len(employer_rows) + len(student_ids)) + len(listing_rows) + application_count
+        rows += _search_terms(listing_rows, employer_rows) + len(summaries)
+
+    # the signals that keep these caches up to date didn't run
+    clear_counters()
+    invalidate_choices()
+
+    seconds = time.monotonic() - start
+    return {'rows': rows, 'seconds': round(seconds, 2), 'rows_per_second': round(rows / seconds if seconds else 0, 2)}
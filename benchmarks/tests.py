@@ -0,0 +1,69 @@
+import random
+
+from django.test import TestCase
+
+from accounts.models import User, StudentProfile
+from helpers.slugs import Slugs
+from marketplace.models import Listing, ListingSummary, Application
+from marketplace.search import search_listings
+from .runner import percentile, run_scenario, compare
+from .scenarios import Data, SCENARIOS
+from .seed import seed
+
+
+class BenchmarksTestCase(TestCase):
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([5], 95), 5)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_compare(self):
+        baseline = {'marketplace': {'p95': 10.0, 'queries': 5.0}, 'apply': {'p95': 10.0, 'queries': 5.0}}
+        results = {'marketplace': {'p95': 11.0, 'queries': 5.0}, 'apply': {'p95': 13.0, 'queries': 6.0},
+                   'search': {'p95': 100.0, 'queries': 50.0}}
+        self.assertEqual(compare(results, baseline), ['apply: 5.0 -> 6.0 queries per request'])
+        self.assertEqual(compare(results, baseline, tolerance=0.2), ['apply: p95 10.0ms -> 13.0ms',
+                                                                       'apply: 5.0 -> 6.0 queries per request'])
+
+    def test_scenarios(self):
+        seed(employers=2, students=5, listings=4, applications=20)
+        data = Data(random.Random(0), iterations=2)
+        for name, scenario in SCENARIOS.items():
+            stats = run_scenario(scenario, data, iterations=2)
+            self.assertEqual(stats['iterations'], 2, name)
+            self.assertGreater(stats['queries'], 0, name)
+
+    def test_seed(self):
+        User.objects.create_user(email='student@test.com', first_name='student', last_name='0',
+                                 password='password', is_student=True, is_employer=False)
+        seeding = seed(employers=3, students=10, listings=6, applications=30, password='password')
+        self.assertGreater(seeding['rows'], 30)
+
+        self.assertEqual(StudentProfile.objects.count(), 11)
+        student = User.objects.get(email='student0@benchmark.test')
+        self.assertEqual(student.slug, 'student-0-2')
+        self.assertTrue(student.check_password('password'))
+        self.assertEqual(len(set(Listing.objects.values_list('slug', flat=True))), 6)
+        self.assertEqual(Application.objects.count(), 30)
+
+        # the rows the signals would have created
+        summary = ListingSummary.objects.get(listing=Listing.objects.first())
+        applications = Application.objects.filter(listing=summary.listing)
+        self.assertEqual(summary.applied, applications.filter(status=Application.APPLIED).count())
+        listing = Listing.objects.first()
+        self.assertIn(listing.id, search_listings(Listing.objects.all(), listing.title.split()[0])
+                      .values_list('id', flat=True))
+
+    def test_seed_every_pair(self):
+        # more applications than pairs of listings and students, every student applies to every listing once
+        seed(employers=1, students=7, listings=3, applications=100)
+        self.assertEqual(Application.objects.count(), 21)
+        self.assertEqual(Application.objects.values('listing', 'student').distinct().count(), 21)
+
+    def test_slugs(self):
+        slugs = Slugs(User)
+        self.assertEqual([slugs.allocate('Some Company'), slugs.allocate('some company'), slugs.allocate('!!')],
+                         ['some-company', 'some-company-2', '-2'])
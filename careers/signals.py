@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from helpers.cache import bump_version
+from .models import Career
+
+
+@receiver(post_save, sender=Career)
+@receiver(post_delete, sender=Career)
+def invalidate_careers(sender, **kwargs):
+    bump_version('careers')
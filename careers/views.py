@@ -1,9 +1,11 @@
 from django.shortcuts import redirect
+from django.utils.decorators import method_decorator
 from django.views.generic import UpdateView, ListView
 
 from .models import Career
 from mixins.admin_required import AdminRequiredMixin
 from decorators.admin_required import admin_required
+from helpers.cache import cache_anonymous
 
 """
 Views for the careers app  
@@ -15,6 +17,7 @@ Currently we support the following views:
 """
 
 
+@method_decorator(cache_anonymous(versions=('careers',)), name='dispatch')
 class CareersPage(ListView):
     template_name = 'careers/careers.html'
     ordering = ['posted']
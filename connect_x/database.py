@@ -0,0 +1,110 @@
+import os
+from contextlib import contextmanager
+
+import dj_database_url
+from django.db import connections, transaction
+
+
+"""
+Database configuration
+Postgres is configured from `DATABASE_URL` (and a read replica from `DATABASE_REPLICA_URL`), SQLite is only used
+when there's no `DATABASE_URL`, in development and the tests. The configuration is tuned with these variables:
+
+1. **`DATABASE_CONN_MAX_AGE`** - how long a connection is kept open between requests in seconds, 600 by default
+2. **`DATABASE_POOLER`** - set it when the database is behind a transaction pooler like PgBouncer
+3. **`DATABASE_STATEMENT_TIMEOUT`** - the longest a statement can run in milliseconds, 30000 by default
+4. **`DATABASE_SSL_REQUIRE`** - set it to `false` for a database without SSL
+
+Currently we support the following 3 helpers:
+
+1. **`databases`** - the `DATABASES` setting
+2. **`statement_timeout`** - a context manager that changes the statement timeout of the queries run in it
+3. **`HealthCheckMiddleware`** - closes persistent connections that were broken between requests
+"""
+
+REPLICA = 'replica'
+
+
+def _flag(name, default=False) -> bool:
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+def _postgres(url, conn_max_age, pooler, timeout, ssl_require) -> dict:
+    config = dj_database_url.parse(url, conn_max_age=conn_max_age, ssl_require=ssl_require)
+    if pooler:
+        # a transaction pooler hands every transaction a different server connection, so server side cursors
+        # can't be used and startup options aren't passed on: set the timeout on the database role instead
+        config['DISABLE_SERVER_SIDE_CURSORS'] = True
+    elif timeout:
+        config.setdefault('OPTIONS', {})['options'] = f'-c statement_timeout={timeout}'
+    return config
+
+
+def databases(base_dir) -> dict:
+    """
+    Build the `DATABASES` setting from the environment
+
+    @param base_dir: the directory the SQLite database is kept in
+    @type base_dir: `Path`
+    @rtype: `dict`
+    @return: the `default` database, and a `replica` database if `DATABASE_REPLICA_URL` is set
+    """
+    url = os.getenv('DATABASE_URL')
+    if not url:
+        return {
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': base_dir / 'db.sqlite3',
+            }
+        }
+
+    options = {
+        'conn_max_age': int(os.getenv('DATABASE_CONN_MAX_AGE', 600)),
+        'pooler': _flag('DATABASE_POOLER'),
+        'timeout': int(os.getenv('DATABASE_STATEMENT_TIMEOUT', 30000)),
+        'ssl_require': _flag('DATABASE_SSL_REQUIRE', True),
+    }
+    config = {'default': _postgres(url, **options)}
+
+    replica = os.getenv('DATABASE_REPLICA_URL')
+    if replica:
+        config[REPLICA] = _postgres(replica, **options)
+        # the tests read from the default database, there's no replication to wait for
+        config[REPLICA]['TEST'] = {'MIRROR': 'default'}
+    return config
+
+
+@contextmanager
+def statement_timeout(milliseconds, using='default'):
+    """
+    Run the queries in the block with a different statement timeout, the block is run in a transaction
+    because the timeout is only set for the current transaction. It does nothing on SQLite
+
+    @param milliseconds: the longest a statement can run, 0 means there's no limit
+    @type milliseconds: `int`
+    @param using: the database the queries are run on
+    @type using: `str`
+    """
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL statement_timeout = %s', [int(milliseconds)])
+        yield
+
+
+class HealthCheckMiddleware:
+    """
+    Close persistent connections that stopped working while they were idle (the database restarted, or the pooler
+    dropped them), Django reconnects on the next query instead of failing the request.
+    Django 3.1 only checks connections after an error, newer versions have the `CONN_HEALTH_CHECKS` setting
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        for connection in connections.all():
+            if connection.connection is not None and not connection.in_atomic_block and not connection.is_usable():
+                connection.close()
+        return self.get_response(request)
@@ -0,0 +1,121 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+"""
+Query budgets for requests, to catch N+1 queries before they're deployed
+The middleware counts the queries every request runs and how long they took, and finds the duplicate queries:
+the same SQL run again with different parameters, usually once for every object in a loop.
+It's configured with these settings:
+
+1. **`QUERY_BUDGET_ENABLED`** - count the queries, off by default
+2. **`QUERY_BUDGETS`** - the most queries the page for a url name can run
+3. **`QUERY_BUDGET_RAISE`** - raise `QueryBudgetExceeded` when a page goes over its budget, the tests turn it on
+4. **`QUERY_BUDGET_HEADERS`** - add the summary to the response as `X-Query-*` headers, for staging
+5. **`QUERY_BUDGET_DUPLICATES`** - how many times the same SQL can run before it's reported as a duplicate
+"""
+
+# the parameters of an `IN` list are collapsed, so lists of different lengths are counted as the same query
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def sql_shape(sql) -> str:
+    """
+    The SQL of a query without its parameters, queries with the same shape only differ by their parameters
+
+    @param sql: the SQL with placeholders for the parameters
+    @type sql: `str`
+    """
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """
+    Records the queries run on every database while it's used as a context manager
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.monotonic() - start))
+
+    def __enter__(self):
+        self.stack = ExitStack()
+        for connection in connections.all():
+            self.stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *args):
+        self.stack.close()
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def seconds(self) -> float:
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self, limit) -> dict:
+        """
+        @param limit: how many times the same SQL can run
+        @type limit: `int`
+        @rtype: `dict`
+        @return: how many times every shape that ran more than `limit` times ran
+        """
+        shapes = Counter(sql_shape(sql) for sql, _ in self.queries)
+        return {shape: count for shape, count in shapes.items() if count > limit}
+
+
+class QueryBudgetMiddleware:
+    """
+    Check every request's queries against the budget for its url name, see the settings above
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', False):
+            return self.get_response(request)
+
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        url_name = request.resolver_match.url_name if request.resolver_match else None
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(url_name)
+        duplicates = recorder.duplicates(getattr(settings, 'QUERY_BUDGET_DUPLICATES', 3))
+
+        if getattr(settings, 'QUERY_BUDGET_HEADERS', False):
+            response['X-Query-Count'] = recorder.count
+            response['X-Query-Time'] = f'{recorder.seconds * 1000:.1f}ms'
+            response['X-Query-Duplicates'] = sum(duplicates.values())
+            if budget is not None:
+                response['X-Query-Budget'] = budget
+
+        for shape, count in duplicates.items():
+            logger.warning('%s ran the same query %d times: %s', request.path, count, shape)
+
+        if budget is not None and recorder.count > budget:
+            message = f'{url_name} ran {recorder.count} queries, its budget is {budget}'
+            if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
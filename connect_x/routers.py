@@ -0,0 +1,90 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from .database import REPLICA
+
+_use_replica = ContextVar('use_replica', default=False)
+
+# how long a user's reads stay on the primary database after they wrote to it, longer than the replica's lag
+READ_YOUR_WRITES = 5
+
+SESSION_KEY = 'primary_reads_until'
+
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+@contextmanager
+def replica_reads():
+    """
+    Send the reads in the block to the read replica, writes always go to the primary database
+    """
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Reads go to the replica inside `replica_reads` when a replica is configured, everything else uses `default`
+    """
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and REPLICA in settings.DATABASES:
+            return REPLICA
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica is a copy of the primary database
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def reads_from_primary(request) -> bool:
+    """
+    If the user wrote to the database in the last `READ_YOUR_WRITES` seconds, the replica might not have their
+    writes yet so their reads should go to the primary database
+
+    @param request: the current request
+    @rtype: `bool`
+    """
+    session = getattr(request, 'session', None)
+    return session is not None and session.get(SESSION_KEY, 0) > time.time()
+
+
+class ReadYourWritesMiddleware:
+    """
+    Mark the session of a request that wrote to the primary database, so `ReplicaReadsMixin` sends that user's
+    reads to the primary database for the next `READ_YOUR_WRITES` seconds, like the page an action redirects to.
+    Put it after `SessionMiddleware`, so saving the session isn't counted as a write
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if REPLICA not in settings.DATABASES:
+            return self.get_response(request)
+
+        writes = []
+
+        def record(execute, sql, params, many, context):
+            if not writes and sql.lstrip()[:6].upper() in WRITES:
+                writes.append(sql)
+            return execute(sql, params, many, context)
+
+        with connections['default'].execute_wrapper(record):
+            response = self.get_response(request)
+        if writes and hasattr(request, 'session'):
+            request.session[SESSION_KEY] = time.time() + READ_YOUR_WRITES
+        return response
@@ -6,6 +6,8 @@ from django.urls import reverse_lazy
 import sentry_sdk
 from sentry_sdk.integrations.django import DjangoIntegration
 
+from connect_x.database import databases
+
 load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,15 +40,21 @@ INSTALLED_APPS = [
     'authentication',
     'home',
     'applications',
-    'interniac_admin'
+    'interniac_admin',
+    'outbox',
+    # only management commands, the benchmark and seeding commands don't add any models or urls
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'connect_x.database.HealthCheckMiddleware',
+    'connect_x.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'connect_x.routers.ReadYourWritesMiddleware',
     'defender.middleware.FailedLoginMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -72,12 +80,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'connect_x.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+DATABASES = databases(BASE_DIR)
+
+DATABASE_ROUTERS = ['connect_x.routers.ReplicaRouter']
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -131,11 +136,47 @@ CLOUDINARY_STORAGE = {'CLOUD_NAME': os.getenv('CLOUDINARY_CLOUD_NAME'), 'API_KEY
     'CLOUDINARY_API_KEY'), 'API_SECRET': os.getenv('CLOUDINARY_API_SECRET'), }
 
 
+# the cache is shared by every process through redis, without `REDIS_URL` (in development and the tests)
+# every process has its own cache in memory
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'helpers.redis_cache.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'KEY_PREFIX': 'connect_x',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'connect_x',
+        }
+    }
+
+# the most queries a page can run, by url name. Turn the budgets on with `QUERY_BUDGET=true`,
+# staging also sets `QUERY_BUDGET_HEADERS=true` to see the summary in the response headers
+QUERY_BUDGET_ENABLED = os.getenv('QUERY_BUDGET', 'false').lower() == 'true'
+QUERY_BUDGET_HEADERS = os.getenv('QUERY_BUDGET_HEADERS', 'false').lower() == 'true'
+QUERY_BUDGET_RAISE = False
+QUERY_BUDGETS = {
+    'marketplace': 10,
+    'filter': 8,
+    'listing': 8,
+    'applications': 8,
+    'acceptances': 8,
+    'rejections': 8,
+    'interview_requests': 8,
+    'awaiting_confirm': 8,
+    'all_applications': 8,
+}
+
 DEFENDER_LOGIN_FAILURE_LIMIT = 10
 DEFENDER_LOCKOUT_TEMPLATE = 'auth/login.html'
 
 if not DEBUG:
-    django_heroku.settings(locals())
+    # the databases are configured by `connect_x.database`
+    django_heroku.settings(locals(), databases=False)
     DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
     DEFENDER_REDIS_URL = os.getenv('REDIS_URL')
     NORECAPTCHA_SITE_KEY = os.environ.get('NORECAPTCHA_SITE_KEY')
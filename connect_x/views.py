@@ -1,5 +1,8 @@
 from django.shortcuts import render
 
+from helpers.cache import cache_anonymous
+
+
 def success(request):
     return render(request, 'success-error/success-general.html')
 
@@ -14,5 +17,6 @@ def error_404(request, exception):
 def error_500(request):
     return render(request, '500.html', status=500)
 
+@cache_anonymous()
 def terms_and_conditions(request):
     return render(request, 'terms_and_conditions.html')
\ No newline at end of file
@@ -0,0 +1,106 @@
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+
+
+"""
+Helpers for caching pages and template fragments
+Cached content is invalidated by keys instead of being deleted: every group of cached content includes a version
+in its keys, bumping the version (from a signal when the data changes) makes the old keys unreachable
+Currently we support the following 4 helper functions:
+
+1. **`get_versions`** - the current version of some groups of cached content
+2. **`get_version`** - the current version of one group of cached content
+3. **`bump_version`** - start a new version of a group of cached content
+4. **`cache_anonymous`** - a view decorator that caches the pages rendered for anonymous users
+"""
+
+TIMEOUT = 60 * 15
+
+
+def _version_key(name) -> str:
+    return f'cache:version:{name}'
+
+
+def get_versions(names) -> dict:
+    """
+    Get the versions of some groups of cached content at once, a group that doesn't have a version yet starts at 1
+
+    @param names: the names of the groups
+    @type names: `list` of `str`
+    @rtype: `dict`
+    @return: the version of every group
+    """
+    cached = cache.get_many([_version_key(name) for name in names])
+    versions = {}
+    for name in names:
+        version = cached.get(_version_key(name))
+        if version is None:
+            cache.add(_version_key(name), 1, None)
+            version = cache.get(_version_key(name), 1)
+        versions[name] = version
+    return versions
+
+
+def get_version(name) -> int:
+    """
+    Get the version of a group of cached content
+
+    @param name: the name of the group
+    @type name: `str`
+    """
+    return get_versions([name])[name]
+
+
+def bump_version(name) -> None:
+    """
+    Start a new version of a group of cached content, the content cached with the old version expires on its own
+
+    @param name: the name of the group
+    @type name: `str`
+    """
+    try:
+        cache.incr(_version_key(name))
+    except ValueError:
+        cache.add(_version_key(name), 1, None)
+
+
+def cache_anonymous(timeout=TIMEOUT, versions=()):
+    """
+    Cache the pages a view renders for anonymous users, logged in users always get a page rendered for them.
+    Only successful `GET` requests are cached, and pages with a CSRF token are never cached because the token
+    belongs to the user it was rendered for
+
+    @param timeout: how long the page is cached in seconds
+    @type timeout: `int`
+    @param versions: the groups of cached content the page is in, the page is rendered again when one is bumped
+    @type versions: `tuple` of `str`
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            version = '.'.join(str(version) for version in get_versions(versions).values())
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            key = f'cache:page:{version}:{path}'
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+            if response.status_code == 200 and not response.streaming \
+                    and not request.META.get('CSRF_COOKIE_USED'):
+                cache.set(key, (response.content, response['Content-Type']), timeout)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -1,25 +1,30 @@
-import threading
-
-from django.core.mail import EmailMessage
 from connect_x.settings import DEBUG
+from outbox.helpers import enqueue_email, enqueue_emails
 
 
 def send_email_thread(from_email, body, to, subject, reply_to) -> None:
     """
-    This function sends an email in a seperate thread
+    This function used to send an email in a seperate thread, emails are sent by the outbox worker now
+    so it's the same as `send_email`
+    """
+    send_email(from_email=from_email, body=body, to=to, subject=subject, reply_to=reply_to)
+
+
+def send_email(from_email, body, to, subject, reply_to) -> None:
+    """
+    This function adds an email to the outbox, the `send_outbox` worker sends it.
+    If it's called in a transaction the email is only sent if the transaction commits
     """
     if not DEBUG:
-        def _send():
-            EmailMessage(body=body, from_email=from_email,
-                         to=to, subject=subject,
-                         reply_to=reply_to).send()
+        enqueue_email(from_email=from_email, body=body, to=to, subject=subject, reply_to=reply_to)
 
-        x = threading.Thread(target=_send)
-        x.start()
 
+def send_emails(emails) -> None:
+    """
+    This function adds many emails to the outbox at once
 
-def send_email(from_email, body, to, subject, reply_to) -> None:
+    @param emails: the arguments to `send_email` for every email
+    @type emails: `list` of `dict`
+    """
     if not DEBUG:
-        EmailMessage(body=body, from_email=from_email,
-                     to=to, subject=subject,
-                     reply_to=reply_to).send()
+        enqueue_emails(emails)
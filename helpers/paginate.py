@@ -1,3 +1,16 @@
+import hashlib
+
+from urllib.parse import urlencode
+
+from django.core import signing
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, InvalidPage, PageNotAnInteger
+from django.db.models import Q
+
+# the page numbers that are still served with `OFFSET`, deeper pages are only reachable with a cursor
+OFFSET_PAGES = 5
+
+
 def paginate(context):
     """
     This function returns the number of pages should be displayed in the paginated menu
@@ -10,6 +23,10 @@ def paginate(context):
     current_page = context.get('page_obj')
     page_no = current_page.number
 
+    if num_pages is None:
+        # the total is unknown, only show the pages up to the next one
+        num_pages = page_no + 1 if current_page.has_next() else page_no
+
     if num_pages <= 15 or page_no <= 6:
         pages = [x for x in range(1, min(num_pages + 1, 16))]
     elif page_no > num_pages - 6:
@@ -18,3 +35,250 @@ def paginate(context):
         pages = [x for x in range(page_no - 5, page_no + 6)]
 
     return pages
+
+
+def page_links(context) -> list:
+    """
+    The page numbers of the paginated menu with the query string of their links, see `paginate`
+
+    @param context: the information being passed to the html page
+    @type context: `dict`
+    @rtype: `list`
+    @return: `(number, query)` for every page in the menu
+    """
+    page = context.get('page_obj')
+    return page.paginator.links(page, paginate(context))
+
+
+def cached_count(queryset, timeout=60) -> int:
+    """
+    This function counts the rows of a queryset and caches the result, so paging through the same
+    results doesn't run a `COUNT(*)` for every page
+
+    @param queryset: the queryset to count
+    @type queryset: `QuerySet`
+    @param timeout: how long the count is cached for in seconds
+    @type timeout: `int`
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    key = 'paginate-count:' + hashlib.md5(f'{sql}{params}'.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class KeysetPage:
+    """
+    A page of results from a `KeysetPaginator`, it can be used in templates like a Django `Page`.
+    Instead of page numbers, the next and previous pages are requested with opaque cursor tokens.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next, has_previous, query=None):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        # the query string that requested this page
+        self.query = query or urlencode({'page': number})
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    def next_page_number(self) -> int:
+        return self.number + 1
+
+    def previous_page_number(self) -> int:
+        return max(self.number - 1, 1)
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.cursor(self.object_list[-1], 'next', self.number + 1)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.cursor(self.object_list[0], 'previous', self.number - 1)
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset by seeking past the last row of the previous page instead of using `OFFSET`,
+    so every page costs the same no matter how deep it is.
+
+    @param queryset: the results to paginate
+    @type queryset: `QuerySet`
+    @param per_page: the number of results per page
+    @type per_page: `int`
+    @param ordering: fields to order by, the last field has to be unique, e.g. `('-posted', '-id')`
+    @type ordering: `tuple`
+    @param count: if the total number of pages should be counted (and cached)
+    @type count: `bool`
+    """
+
+    salt = 'helpers.paginate.KeysetPaginator'
+
+    def __init__(self, queryset, per_page, ordering, count=True, count_timeout=60):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        self.count_enabled = count
+        self.count_timeout = count_timeout
+
+    @property
+    def count(self):
+        if not self.count_enabled:
+            return None
+        return cached_count(self.queryset, self.count_timeout)
+
+    @property
+    def num_pages(self):
+        count = self.count
+        if count is None:
+            return None
+        return max((count + self.per_page - 1) // self.per_page, 1)
+
+    def cursor(self, obj, direction, number) -> str:
+        return self._cursor([getattr(obj, field) for field in self.fields], direction, number)
+
+    def _cursor(self, values, direction, number) -> str:
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        return signing.dumps({'v': values, 'd': direction, 'n': number}, salt=self.salt, compress=True)
+
+    def _keys(self, obj, forward, pages) -> list:
+        """
+        The ordering values of the rows in the next (or previous) `pages` pages after `obj`, only the keys are read
+        """
+        if pages <= 0:
+            return []
+        values = [getattr(obj, field) for field in self.fields]
+        ordering = self.ordering if forward else self._reversed_ordering()
+        return list(self.queryset.filter(self._seek(values, forward)).order_by(*ordering)
+                    .values_list(*self.fields)[:pages * self.per_page])
+
+    def links(self, page, numbers) -> list:
+        """
+        The query string of a link to every page number in the menu. The first `OFFSET_PAGES` pages are linked
+        by number, the rest with a cursor from the row just before (or after) the page,
+        the keys of the pages between this page and the furthest page linked are read with one query each way
+
+        @type page: `KeysetPage`
+        @param numbers: the page numbers in the menu
+        @type numbers: `list`
+        @rtype: `list`
+        @return: `(number, query)` for every page that exists
+        """
+        if not page.object_list:
+            return [(number, urlencode({'page': number})) for number in numbers if number <= OFFSET_PAGES]
+
+        deep = [number for number in numbers if number > OFFSET_PAGES and number != page.number]
+        # the keys of the pages between this page and the page before the furthest one
+        ahead = self._keys(page.object_list[-1], True,
+                           max([number - page.number - 1 for number in deep], default=0))
+        behind = self._keys(page.object_list[0], False,
+                            max([page.number - number - 1 for number in deep], default=0))
+
+        links = []
+        for number in numbers:
+            if number == page.number:
+                query = page.query
+            elif number <= OFFSET_PAGES:
+                query = urlencode({'page': number})
+            elif number == page.number + 1:
+                query = urlencode({'cursor': page.next_cursor}) if page.has_next() else None
+            elif number == page.number - 1:
+                query = urlencode({'cursor': page.previous_cursor})
+            elif number > page.number:
+                # the last row of the page before
+                index = (number - page.number - 1) * self.per_page - 1
+                query = urlencode({'cursor': self._cursor(ahead[index], 'next', number)}) \
+                    if index < len(ahead) else None
+            else:
+                # the first row of the page after
+                index = (page.number - number - 1) * self.per_page - 1
+                query = urlencode({'cursor': self._cursor(behind[index], 'previous', number)}) \
+                    if index < len(behind) else None
+            if query is not None:
+                links.append((number, query))
+        return links
+
+    def _seek(self, values, forward):
+        """
+        Build the filter for rows that come after (or before) the row with the values specified in this ordering
+        """
+        query = Q()
+        for i, field in enumerate(self.ordering):
+            descending = field.startswith('-')
+            lookup = 'lt' if descending == forward else 'gt'
+            condition = Q(**{f'{self.fields[i]}__{lookup}': values[i]})
+            for j in range(i):
+                condition &= Q(**{self.fields[j]: values[j]})
+            query |= condition
+        return query
+
+    def _reversed_ordering(self):
+        return [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+
+    def page(self, cursor=None, number=None) -> KeysetPage:
+        """
+        Get a page from a cursor token, or from a page number for the first `OFFSET_PAGES` pages
+
+        @raises `InvalidPage`: if the cursor or page number is invalid
+        """
+        if cursor:
+            try:
+                data = signing.loads(cursor, salt=self.salt)
+                values, direction, number = data['v'], data['d'], int(data['n'])
+            except (signing.BadSignature, KeyError, TypeError, ValueError):
+                raise InvalidPage('Invalid cursor')
+            if len(values) != len(self.fields):
+                raise InvalidPage('Invalid cursor')
+
+            if direction == 'previous':
+                rows = list(self.queryset.filter(self._seek(values, forward=False))
+                            .order_by(*self._reversed_ordering())[:self.per_page + 1])
+                has_previous = len(rows) > self.per_page
+                rows = rows[:self.per_page][::-1]
+                return KeysetPage(rows, max(number, 1), self, has_next=True, has_previous=has_previous,
+                                  query=urlencode({'cursor': cursor}))
+
+            rows = list(self.queryset.filter(self._seek(values, forward=True))
+                        .order_by(*self.ordering)[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], number, self,
+                              has_next=len(rows) > self.per_page, has_previous=True,
+                              query=urlencode({'cursor': cursor}))
+
+        try:
+            number = int(number or 1)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        if number > OFFSET_PAGES:
+            # an `OFFSET` this deep scans every row before the page
+            raise EmptyPage('That page can only be requested with a cursor')
+
+        bottom = (number - 1) * self.per_page
+        rows = list(self.queryset.order_by(*self.ordering)[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return KeysetPage(rows[:self.per_page], number, self,
+                          has_next=len(rows) > self.per_page, has_previous=number > 1)
@@ -0,0 +1,113 @@
+import pickle
+import time
+
+import redis
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+
+
+class RedisCache(BaseCache):
+    """
+    A cache backend for a Redis server, `LOCATION` is the server's url (the same `REDIS_URL` `defender` uses).
+    Integers are stored as they are so `incr` is atomic on the server, everything else is pickled.
+    Django 3.1 has no Redis backend, this only uses the `redis` client the project already depends on
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._client = redis.Redis.from_url(server, **options)
+
+    def _encode(self, value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def _decode(self, value):
+        try:
+            return int(value)
+        except ValueError:
+            return pickle.loads(value)
+
+    def _expiry(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return None
+        # redis doesn't accept a timeout of 0, the key is deleted straight away instead
+        return max(int(timeout - time.time()), 0) if timeout else 0
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        expiry = self._expiry(timeout)
+        if expiry == 0:
+            return False
+        return bool(self._client.set(key, self._encode(value), ex=expiry, nx=True))
+
+    def get(self, key, default=None, version=None):
+        value = self._client.get(self._key(key, version))
+        return default if value is None else self._decode(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        expiry = self._expiry(timeout)
+        if expiry == 0:
+            self._client.delete(key)
+        else:
+            self._client.set(key, self._encode(value), ex=expiry)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        expiry = self._expiry(timeout)
+        if expiry is None:
+            return bool(self._client.persist(key))
+        return bool(self._client.expire(key, expiry))
+
+    def delete(self, key, version=None):
+        return bool(self._client.delete(self._key(key, version)))
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self._client.mget([self._key(key, version) for key in keys])
+        return {key: self._decode(value) for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expiry = self._expiry(timeout)
+        with self._client.pipeline() as pipeline:
+            for key, value in data.items():
+                key = self._key(key, version)
+                if expiry == 0:
+                    pipeline.delete(key)
+                else:
+                    pipeline.set(key, self._encode(value), ex=expiry)
+            pipeline.execute()
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._client.delete(*keys)
+
+    def has_key(self, key, version=None):
+        return bool(self._client.exists(self._key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        if not self._client.exists(key):
+            raise ValueError("Key '%s' not found" % key)
+        return self._client.incr(key, delta)
+
+    def clear(self):
+        # the server is shared with `defender`, only the keys with this cache's prefix are deleted
+        keys = list(self._client.scan_iter(match=f'{self.key_prefix}:*' if self.key_prefix else '*'))
+        if keys:
+            self._client.delete(*keys)
+
+    def close(self, **kwargs):
+        # the client keeps its connection pool for the whole process
+        pass
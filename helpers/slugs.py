@@ -0,0 +1,121 @@
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.template.defaultfilters import slugify
+
+
+"""
+Unique slugs, allocated the same way as `unique_slugify` (`name`, `name-2`, `name-3`...) without probing the
+database once for every suffix that's taken
+Currently we support the following helpers:
+
+1. **`Slugs`** - allocates the slugs of many rows of a model after reading the taken slugs once
+2. **`unique_slug`** - the slug of one instance, only allocated again when the value it's made from changes
+3. **`save_with_unique_slug`** - inserts an instance with a unique slug, allocating again if another row took it
+"""
+
+# the longest suffix that the prefix query still covers, `-` and up to 9 digits
+SUFFIX_LENGTH = 10
+
+SAVE_ATTEMPTS = 5
+
+
+def _original(value, max_length) -> str:
+    return slugify(value)[:max_length].strip('-')
+
+
+def _made_from(slug, value, max_length) -> bool:
+    """
+    If `slug` is one of the slugs `value` could have been given, with or without a suffix
+    """
+    original = _original(value, max_length)
+    if slug == original and slug:
+        return True
+    match = re.fullmatch(r'(.*)-(\d+)', slug)
+    return bool(match) and match.group(1) == original[:max_length - len(match.group(2)) - 1].strip('-')
+
+
+class Slugs:
+    """
+    Unique slugs for many rows of a model, allocated in memory the same way as `unique_slugify`
+    (`name`, `name-2`, `name-3`...) after reading the model's existing slugs once
+
+    @param model: the model with a `slug` field
+    @param prefixes: only read the slugs that `allocate` could collide with for these values, for allocating
+    a few slugs with one query instead of reading every slug of the model
+    @type prefixes: `list`
+    @param exclude: the primary key of the row the slug is for, its own slug isn't taken
+    """
+
+    def __init__(self, model, prefixes=None, exclude=None):
+        self.max_length = model._meta.get_field('slug').max_length
+        slugs = model.objects.exclude(slug='')
+        if prefixes is not None:
+            # indexed `LIKE 'prefix%'`s, the slug fields have a `varchar_pattern_ops` index on Postgres
+            query = Q(pk__in=[])
+            for prefix in {self._prefix(value) for value in prefixes}:
+                query |= Q(slug__startswith=prefix)
+            slugs = slugs.filter(query)
+        if exclude is not None:
+            slugs = slugs.exclude(pk=exclude)
+        self.taken = set(slugs.values_list('slug', flat=True))
+        self.next = {}
+
+    def _prefix(self, value) -> str:
+        # the start every candidate for `value` shares, even once it's cut short for a long suffix
+        return _original(value, self.max_length)[:self.max_length - SUFFIX_LENGTH].rstrip('-') or '-'
+
+    def allocate(self, value) -> str:
+        original = _original(value, self.max_length)
+        slug = original
+        suffix = self.next.get(original, 2)
+        while not slug or slug in self.taken:
+            end = f'-{suffix}'
+            slug = f"{original[:self.max_length - len(end)].strip('-')}{end}"
+            suffix += 1
+        self.next[original] = suffix
+        self.taken.add(slug)
+        return slug
+
+
+def unique_slug(instance, value) -> str:
+    """
+    A unique slug of `value` for `instance`, a replacement for `unique_slugify`.
+    The instance keeps its slug when it was already made from `value`, without a query,
+    otherwise the taken slugs are read with one prefix query
+
+    @param instance: a model instance with a `slug` field
+    @param value: what the slug is made from, like a name or a title
+    @type value: `str`
+    @rtype: `str`
+    """
+    max_length = instance._meta.get_field('slug').max_length
+    if instance.slug and _made_from(instance.slug, value, max_length):
+        return instance.slug
+    return Slugs(type(instance), prefixes=[value], exclude=instance.pk).allocate(value)
+
+
+def save_with_unique_slug(instance, value, save) -> None:
+    """
+    Allocate the slug of a new instance and insert it. Another row can take the same slug between reading
+    the taken slugs and the insert, then the insert is rolled back to a savepoint and tried with a new slug
+
+    @param instance: a new model instance with a unique `slug` field
+    @param value: what the slug is made from
+    @type value: `str`
+    @param save: inserts the instance
+    @type save: `function`
+    """
+    model = type(instance)
+    for attempt in range(SAVE_ATTEMPTS):
+        instance.slug = unique_slug(instance, value)
+        try:
+            with transaction.atomic():
+                save()
+            return
+        except IntegrityError:
+            # some other constraint failed, or it kept losing the race
+            if attempt == SAVE_ATTEMPTS - 1 or not model.objects.filter(slug=instance.slug).exists():
+                raise
+            instance.slug = ''
@@ -1,10 +1,15 @@
 from django.contrib import admin
 
-from .models import Event
+from .models import Event, NewsletterSignup
 
 
 class StatsAdmin(admin.ModelAdmin):
     list_display = ('students', 'employers', 'professionals')
 
 
+class NewsletterSignupAdmin(admin.ModelAdmin):
+    list_display = ('email', 'created', 'synced')
+
+
 admin.site.register(Event)
+admin.site.register(NewsletterSignup, NewsletterSignupAdmin)
@@ -4,7 +4,7 @@ from django import forms
 from nocaptcha_recaptcha import NoReCaptchaField
 
 from helpers.email import send_email
-from .helpers import insert_into_spreadsheet
+from .models import NewsletterSignup
 
 
 class ContactForm(forms.Form):
@@ -25,7 +25,10 @@ class EmailForm(forms.Form):
     email_signup = forms.EmailField(widget=forms.EmailInput(attrs={'placeholder': 'Email Address'}))
 
     def is_valid(self):
-        insert_into_spreadsheet(self.data['email_signup'])
-        send_email(from_email=os.environ.get('EMAIL'), body='Thank you for signing up for our newsletter.',
-                          to=[self.data['email_signup']], reply_to=[None], subject='Thank you!')
-        return super(EmailForm, self).is_valid()
+        valid = super(EmailForm, self).is_valid()
+        if valid:
+            # the signup is copied to the spreadsheet later by the sync_newsletter command
+            NewsletterSignup.objects.get_or_create(email=self.cleaned_data['email_signup'].lower())
+            send_email(from_email=os.environ.get('EMAIL'), body='Thank you for signing up for our newsletter.',
+                       to=[self.cleaned_data['email_signup']], reply_to=[None], subject='Thank you!')
+        return valid
@@ -4,22 +4,39 @@ from django.utils import timezone
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
+from .models import NewsletterSignup
 
-def insert_into_spreadsheet(email) -> None:
+
+SPREADSHEET = 'Join Interniac (Responses)'
+
+
+def get_sheet():
+    """
+    Authorize with the service account and open the newsletter spreadsheet
+    """
     scope = ['https://www.googleapis.com/auth/drive']
     creds = ServiceAccountCredentials.from_json_keyfile_name(
         os.path.join(Path(__file__).resolve().parent.parent, 'google-credentials.json'), scope)
     client = gspread.authorize(creds)
-    sheet = client.open("Join Interniac (Responses)").sheet1
-    if not _email_exists(email, sheet):
-        sheet.append_row([timezone.now().strftime('%m/%d/%Y %H:%M:%S'), email])
+    return client.open(SPREADSHEET).sheet1
 
 
-def _email_exists(email, sheet) -> bool:
-    email_list = sheet.col_values(2)
+def sync_newsletter_signups(sheet=None, batch_size=500) -> int:
+    """
+    Append the signups that aren't in the spreadsheet yet with one request per batch
 
-    for i in email_list:
-        if i == email:
-            return True
+    @param sheet: the worksheet to append to, the newsletter spreadsheet is opened if it's `None`
+    @type sheet: `gspread.Worksheet`
+    @returns: the number of signups that were appended
+    """
+    synced = 0
+    while True:
+        signups = list(NewsletterSignup.objects.filter(synced__isnull=True).order_by('id')[:batch_size])
+        if not signups:
+            return synced
 
-    return False
+        if sheet is None:
+            sheet = get_sheet()
+        sheet.append_rows([[signup.created.strftime('%m/%d/%Y %H:%M:%S'), signup.email] for signup in signups])
+        NewsletterSignup.objects.filter(id__in=[signup.id for signup in signups]).update(synced=timezone.now())
+        synced += len(signups)
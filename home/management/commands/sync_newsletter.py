@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from home.helpers import sync_newsletter_signups
+
+
+class Command(BaseCommand):
+    help = 'Append new newsletter signups to the newsletter spreadsheet, run it periodically with the scheduler'
+
+    def handle(self, *args, **options):
+        synced = sync_newsletter_signups()
+        self.stdout.write(f'Synced {synced} signups')
@@ -0,0 +1,22 @@
+# Generated by Django 3.1.9 on 2026-10-18 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0004_auto_20210504_2218'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsletterSignup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('synced', models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+        ),
+    ]
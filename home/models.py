@@ -17,3 +17,17 @@ class Event(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class NewsletterSignup(models.Model):
+    """
+    An email signed up for the newsletter. Signups are copied to the newsletter spreadsheet
+    by the `sync_newsletter` command, `synced` is when that happened
+    """
+
+    email = models.EmailField(unique=True)
+    created = models.DateTimeField(auto_now_add=True)
+    synced = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return self.email
@@ -1,3 +1,142 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your tests here.
+from accounts.models import User
+from careers.models import Career
+
+from outbox.models import OutboxEmail
+from .helpers import sync_newsletter_signups
+from .models import NewsletterSignup, Event
+
+
+class Sheet:
+    """
+    Keeps the rows appended to it like a gspread worksheet
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    def append_rows(self, rows):
+        self.requests.append(rows)
+
+
+class NewsletterTestCase(TestCase):
+
+    def signup(self, email):
+        return self.client.post(reverse('home'), {'email_signup': email})
+
+    def test_signup(self):
+        response = self.signup('student@test.com')
+        self.assertRedirects(response, reverse('success'), fetch_redirect_response=False)
+        self.assertTrue(NewsletterSignup.objects.filter(email='student@test.com', synced=None).exists())
+        self.assertTrue(OutboxEmail.objects.filter(to=['student@test.com']).exists())
+
+    def test_signup_twice(self):
+        self.signup('student@test.com')
+        self.signup('Student@test.com')
+        self.assertEqual(NewsletterSignup.objects.count(), 1)
+
+    def test_invalid_signup(self):
+        response = self.signup('not an email')
+        self.assertRedirects(response, reverse('error'), fetch_redirect_response=False)
+        self.assertFalse(NewsletterSignup.objects.exists())
+
+    def test_sync(self):
+        for i in range(5):
+            NewsletterSignup.objects.create(email=f'student{i}@test.com')
+        sheet = Sheet()
+        self.assertEqual(sync_newsletter_signups(sheet, batch_size=3), 5)
+        self.assertEqual([len(rows) for rows in sheet.requests], [3, 2])
+        self.assertEqual(sheet.requests[0][0][1], 'student0@test.com')
+        self.assertFalse(NewsletterSignup.objects.filter(synced=None).exists())
+
+        # only new signups are appended
+        NewsletterSignup.objects.create(email='new@test.com')
+        sheet = Sheet()
+        self.assertEqual(sync_newsletter_signups(sheet), 1)
+        self.assertEqual(sheet.requests, [[[sheet.requests[0][0][0], 'new@test.com']]])
+
+    def test_sync_nothing(self):
+        sheet = Sheet()
+        self.assertEqual(sync_newsletter_signups(sheet), 0)
+        self.assertEqual(sheet.requests, [])
+
+
+class CountersTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def create_user(self, email, is_student) -> User:
+        return User.objects.create_user(email=email, first_name='first', last_name='last', password='password',
+                                        is_student=is_student, is_employer=not is_student)
+
+    def counters(self):
+        response = self.client.get(reverse('home'))
+        return response.context['students'], response.context['employers']
+
+    def test_counters(self):
+        self.create_user('student@test.com', True)
+        self.create_user('employer@test.com', False)
+        self.assertEqual(self.counters(), (1, 1))
+
+        # the counters are updated by the signals, without counting again
+        student = self.create_user('student2@test.com', True)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.counters(), (2, 1))
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql']])
+
+        student.delete()
+        self.assertEqual(self.counters(), (1, 1))
+
+    def test_counters_expired(self):
+        self.create_user('student@test.com', True)
+        self.assertEqual(self.counters(), (1, 0))
+        cache.clear()
+        self.create_user('student2@test.com', True)
+        self.assertEqual(self.counters(), (2, 0))
+
+
+class PageCacheTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self, path) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def create_event(self, name) -> Event:
+        return Event.objects.create(datetime=timezone.now(), name=name, description='description',
+                                    meet_url='https://meet.google.com/')
+
+    def test_logged_in_page_not_cached(self):
+        User.objects.create_user(email='student@test.com', first_name='first', last_name='last',
+                                 password='password', is_student=True, is_employer=False)
+        self.client.login(username='student@test.com', password='password')
+        Career.objects.create(content='some career')
+        self.client.get(reverse('careers'))
+        self.assertNotEqual(self.count_queries(reverse('careers')), 0)
+
+    def test_anonymous_page_cached(self):
+        Career.objects.create(content='some career')
+        self.assertContains(self.client.get(reverse('careers')), 'some career')
+        self.assertEqual(self.count_queries(reverse('careers')), 0)
+        Career.objects.create(content='another career')
+        self.assertContains(self.client.get(reverse('careers')), 'another career')
+
+    def test_home_events_cached(self):
+        self.create_event('some event')
+        self.assertContains(self.client.get(reverse('home')), 'some event')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('home'))
+        self.assertFalse([query for query in queries if 'home_event' in query['sql']])
+        self.create_event('another event')
+        self.assertContains(self.client.get(reverse('home')), 'another event')
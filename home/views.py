@@ -1,7 +1,8 @@
 from django.shortcuts import render, redirect
 from django.views.generic import TemplateView
 
-from accounts.models import User
+from accounts.counters import get_counters
+from helpers.cache import cache_anonymous, get_version
 from .forms import ContactForm, EmailForm
 from .models import Event
 
@@ -13,9 +14,10 @@ class HomePage(TemplateView):
         context = super().get_context_data()
         context['contact_form'] = ContactForm()
         context['newsletter_form'] = EmailForm()
+        # the events are rendered from the cache until an event changes, the page has CSRF tokens so it isn't cached
         context['events'] = Event.objects.all()[:3]
-        context['students'] = User.objects.filter(is_student=True).count()
-        context['employers'] = User.objects.filter(is_employer=True).count()
+        context['events_version'] = get_version('events')
+        context.update(get_counters())
         return context
 
     def post(self, request, **kwargs):
@@ -34,5 +36,6 @@ class HomePage(TemplateView):
             return redirect('error')
 
 
+@cache_anonymous(versions=('events',))
 def read_more(request, pk):
     return render(request, 'read-more.html', {'event': Event.objects.get(id=pk)})
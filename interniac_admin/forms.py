@@ -0,0 +1,41 @@
+from django import forms
+
+from accounts.models import User, EmployerProfile, StudentProfile
+from authentication.forms import ACCOUNT_TYPES
+
+"""
+Forms for the interniac admin app
+Currently we support the following forms:
+
+1. **`ImportAccountsForm`** - Upload a CSV of accounts to create
+2. **`AccountRowForm`** - Validates one row of the CSV
+"""
+
+
+class ImportAccountsForm(forms.Form):
+    file = forms.FileField(help_text='A CSV with the columns email, first_name, last_name, account_type '
+                                     '(student or employer), company_name and school')
+
+
+class AccountRowForm(forms.Form):
+    email = forms.EmailField(max_length=User._meta.get_field('email').max_length)
+    first_name = forms.CharField(max_length=User._meta.get_field('first_name').max_length)
+    last_name = forms.CharField(max_length=User._meta.get_field('last_name').max_length)
+    account_type = forms.ChoiceField(choices=ACCOUNT_TYPES)
+    company_name = forms.CharField(max_length=EmployerProfile._meta.get_field('company_name').max_length,
+                                   required=False)
+    school = forms.CharField(max_length=StudentProfile._meta.get_field('hs').max_length, required=False)
+
+    def clean_email(self):
+        return User.objects.normalize_email(self.cleaned_data['email'])
+
+    def clean(self):
+        """
+        The same rules as `UserCreateForm`, employers need a company and students can't have one
+        """
+        cleaned_data = super().clean()
+        if cleaned_data.get('account_type') == 'employer' and not cleaned_data.get('company_name'):
+            self.add_error('company_name', 'Enter the company\'s name')
+        if cleaned_data.get('account_type') == 'student' and cleaned_data.get('company_name'):
+            self.add_error('company_name', 'Student can\'t have a company')
+        return cleaned_data
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from interniac_admin.onboarding import import_accounts, CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Create the students and employers in a CSV, for rosters too big to upload'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='The CSV to import')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        with open(options['path'], 'rb') as file:
+            results = import_accounts(file, options['chunk_size'])
+
+        for error in results['errors']:
+            self.stderr.write(f"line {error['line']} ({error['email']}): {error['error']}")
+        self.stdout.write(f"created {results['created']} of {results['rows']} accounts in {results['seconds']:.1f}s, "
+                          f"{results['rows_per_second']:.0f} rows/s")
@@ -0,0 +1,183 @@
+import csv
+import io
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Upper
+
+from accounts.counters import clear_counters
+from accounts.models import User, StudentProfile, EmployerProfile
+from helpers.slugs import Slugs
+from marketplace.choices import invalidate_choices
+from .forms import AccountRowForm
+
+
+"""
+Bulk onboarding of the students and employers in a school's roster
+The CSV is read one chunk of rows at a time, so a file of any size is never loaded into memory.
+Every chunk is validated, checked against the existing accounts with one query,
+and its users and profiles are inserted with `bulk_create` in one transaction
+
+"""
+
+CHUNK_SIZE = 500
+
+COLUMNS = ('email', 'first_name', 'last_name', 'account_type', 'company_name', 'school')
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Onboarding:
+    """
+    Import the accounts in a CSV, the users get an unusable password and set theirs with a password reset
+
+    @param chunk_size: the number of rows validated and inserted together
+    @type chunk_size: `int`
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.password = make_password(None)
+        # the emails and company names seen in the file so far, uppercased
+        self.emails = set()
+        self.companies = set()
+        self.results = {'rows': 0, 'created': 0, 'errors': [], 'seconds': 0.0, 'rows_per_second': 0.0}
+
+    def _error(self, line, email, message):
+        self.results['errors'].append({'line': line, 'email': email, 'error': message})
+
+    def _validate(self, chunk) -> list:
+        forms = []
+        for line, row in chunk:
+            form = AccountRowForm({column: (row.get(column) or '').strip() for column in COLUMNS})
+            if not form.is_valid():
+                errors = '; '.join(f'{field}: {" ".join(messages)}' for field, messages in form.errors.items())
+                self._error(line, row.get('email'), errors)
+            else:
+                forms.append((line, form.cleaned_data))
+
+        # emails and company names are unique regardless of case, `UPPER()` like the functional indexes
+        # `user_email_upper` and `employer_company_name_upper` so the lookups use them on Postgres
+        existing = set(User.objects.annotate(upper=Upper('email'))
+                       .filter(upper__in=[data['email'].upper() for _, data in forms])
+                       .values_list('upper', flat=True))
+        companies = {data['company_name'].upper() for _, data in forms if data['company_name']}
+        existing_companies = set(EmployerProfile.objects.annotate(upper=Upper('company_name'))
+                                 .filter(upper__in=companies).values_list('upper', flat=True))
+
+        valid = []
+        for line, data in forms:
+            email = data['email'].upper()
+            company = data['company_name'].upper()
+            if email in existing or email in self.emails:
+                self._error(line, data['email'], 'An account with this email already exists')
+            elif company and (company in existing_companies or company in self.companies):
+                self._error(line, data['email'], 'Company already exists')
+            else:
+                self.emails.add(email)
+                if company:
+                    self.companies.add(company)
+                valid.append((line, data))
+        return valid
+
+    def _insert(self, rows) -> None:
+        # read for every chunk, other accounts can be created during a long import
+        slugs = Slugs(User, prefixes=[self._name(data) for _, data in rows])
+        users = []
+        for _, data in rows:
+            employer = data['account_type'] == 'employer'
+            users.append(User(email=data['email'], first_name=data['first_name'], last_name=data['last_name'],
+                              password=self.password, is_employer=employer, is_student=not employer,
+                              slug=slugs.allocate(self._name(data))))
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            # SQLite doesn't return the ids from `bulk_create`
+            ids = dict(User.objects.filter(email__in=[user.email for user in users]).values_list('email', 'id'))
+            StudentProfile.objects.bulk_create([StudentProfile(user_id=ids[data['email']], hs=data['school'] or None)
+                                                for _, data in rows if data['account_type'] == 'student'])
+            EmployerProfile.objects.bulk_create([EmployerProfile(user_id=ids[data['email']],
+                                                                 company_name=data['company_name'])
+                                                 for _, data in rows if data['account_type'] == 'employer'])
+        self.results['created'] += len(users)
+
+    def _insert_chunk(self, rows) -> None:
+        """
+        Insert a chunk, if an account was created while it was validated the chunk is inserted one row at a time
+        and only the rows that fail are reported
+        """
+        try:
+            self._insert(rows)
+        except IntegrityError:
+            for line, data in rows:
+                try:
+                    self._insert([(line, data)])
+                except IntegrityError as error:
+                    self._error(line, data['email'], self._conflict(data, error))
+
+    @staticmethod
+    def _conflict(data, error) -> str:
+        # the email is the only unique column of a row, any other constraint is reported as the database did
+        if User.objects.annotate(upper=Upper('email')).filter(upper=data['email'].upper()).exists():
+            return 'An account with this email already exists'
+        return str(error)
+
+    @staticmethod
+    def _name(data) -> str:
+        # the same slugs the profile signals would give them
+        if data['account_type'] == 'employer':
+            return data['company_name']
+        return f"{data['first_name']} {data['last_name']}"
+
+    def run(self, file) -> dict:
+        """
+        @param file: the CSV, a text file
+        @type file: `file`
+        @rtype: `dict`
+        @return: the number of `rows` read and accounts `created`, the `errors` of the rows that weren't imported
+        (their `line`, `email` and `error`), how long it took in `seconds` and the `rows_per_second`
+        """
+        start = time.monotonic()
+        reader = csv.DictReader(file)
+        missing = [column for column in ('email', 'first_name', 'last_name', 'account_type')
+                   if column not in (reader.fieldnames or [])]
+        if missing:
+            self._error(1, None, f'Missing columns: {", ".join(missing)}')
+            return self.results
+
+        # the header is line 1
+        for chunk in _chunks(enumerate(reader, start=2), self.chunk_size):
+            self.results['rows'] += len(chunk)
+            valid = self._validate(chunk)
+            if valid:
+                self._insert_chunk(valid)
+
+        if self.results['created']:
+            # the signals that keep these caches up to date didn't run
+            clear_counters()
+            invalidate_choices()
+
+        self.results['errors'].sort(key=lambda error: error['line'])
+        seconds = time.monotonic() - start
+        self.results['seconds'] = round(seconds, 2)
+        self.results['rows_per_second'] = round(self.results['rows'] / seconds if seconds else 0, 2)
+        return self.results
+
+
+def import_accounts(file, chunk_size=CHUNK_SIZE) -> dict:
+    """
+    Import the accounts in a CSV, see `Onboarding.run`
+
+    @param file: the CSV, an uploaded file or a file opened in binary mode
+    """
+    return Onboarding(chunk_size).run(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
@@ -1,3 +1,7 @@
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
 from django.test import TestCase
 from django.http import HttpResponse
 from django.urls import reverse
@@ -5,7 +9,8 @@ from django.utils import timezone
 
 from mixins.init_accounts import InitAccountsMixin
 from marketplace.models import Listing, Career
-from accounts.models import User
+from accounts.models import User, StudentProfile, EmployerProfile
+from interniac_admin.onboarding import Onboarding
 
 
 class ApplicationsTestCase(TestCase, InitAccountsMixin):
@@ -68,4 +73,118 @@ class ApplicationsTestCase(TestCase, InitAccountsMixin):
         self.login(self.employer)
         response = self.client.post(
             reverse('delete_account', kwargs={'id': self.student.id}))
-        self.assertEqual(403, response.status_code)
\ No newline at end of file
+        self.assertEqual(403, response.status_code)
+
+    def test_admin_view_all_users(self):
+        self.login(self.admin)
+        response = self.client.get(reverse('all_users'))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(list(response.context['object_list']),
+                         list(User.objects.order_by('-date_joined', '-id')))
+
+    def test_users_with_profiles(self):
+        for i in range(3):
+            User.objects.create_user(email=f'employer{i}@test.com', first_name='first', last_name='last',
+                                     password='password', is_student=False, is_employer=True)
+        users = list(User.objects.with_profiles())
+        with self.assertNumQueries(0):
+            names = [str(user) for user in users]
+            profiles = [user.profile for user in users if user.is_student]
+        self.assertIn(self.employer.employer_profile.company_name, names)
+        self.assertEqual(profiles, [self.student.profile])
+
+    def test_admin_view_user_info(self):
+        self.login(self.admin)
+        response = self.client.get(reverse('user_info', kwargs={'slug': self.employer.slug}))
+        self.assertEqual(200, response.status_code)
+        with self.assertNumQueries(0):
+            str(response.context['object'])
+
+    def import_accounts(self, rows) -> HttpResponse:
+        csv = 'email,first_name,last_name,account_type,company_name,school\n' + '\n'.join(rows)
+        return self.client.post(reverse('import_accounts'),
+                                {'file': SimpleUploadedFile('roster.csv', csv.encode(), content_type='text/csv')})
+
+    def test_import_accounts(self):
+        self.login(self.admin)
+        response = self.import_accounts([
+            'new@test.com,new,student,student,,some school',
+            'company@test.com,new,employer,employer,New company,',
+            'test@gmail.com,existing,student,student,,',
+            'NEW@test.com,duplicate,student,student,,',
+            'not an email,bad,row,student,,',
+            'other@test.com,no,company,employer,,',
+            'other2@test.com,taken,company,employer,some company,',
+        ])
+        results = response.context['results']
+        self.assertEqual((results['rows'], results['created']), (7, 2))
+        self.assertEqual([error['line'] for error in results['errors']], [4, 5, 6, 7, 8])
+
+        student = User.objects.get(email='new@test.com')
+        self.assertEqual((student.slug, student.profile.hs), ('new-student', 'some school'))
+        self.assertFalse(student.has_usable_password())
+        employer = User.objects.get(email='company@test.com')
+        self.assertEqual((employer.slug, employer.employer_profile.company_name), ('new-company', 'New company'))
+
+    def test_import_accounts_in_chunks(self):
+        self.login(self.admin)
+        rows = [f'student{i}@test.com,first,last,student,,' for i in range(1200)]
+        results = self.import_accounts(rows).context['results']
+        self.assertEqual((results['created'], results['errors']), (1200, []))
+        self.assertEqual(StudentProfile.objects.filter(user__email__startswith='student').count(), 1200)
+        self.assertEqual(len(set(User.objects.filter(email__startswith='student').values_list('slug', flat=True))),
+                         1200)
+
+    def test_import_accounts_existing_any_case(self):
+        self.login(self.admin)
+        results = self.import_accounts([
+            'TEST@gmail.com,existing,student,student,,',
+            'other@test.com,taken,company,employer,SOME COMPANY,',
+            'new@test.com,new,student,student,,',
+        ]).context['results']
+        self.assertEqual(results['created'], 1)
+        self.assertEqual([error['line'] for error in results['errors']], [2, 3])
+
+    def test_import_accounts_created_during_import(self):
+        self.login(self.admin)
+        insert = Onboarding._insert
+
+        def created_meanwhile(onboarding, rows):
+            # another request creates one of the chunk's accounts after it was validated
+            if len(rows) > 1:
+                User.objects.create_user(email='second@test.com', first_name='first', last_name='last',
+                                         password='password', is_student=True, is_employer=False)
+            insert(onboarding, rows)
+
+        with mock.patch.object(Onboarding, '_insert', created_meanwhile):
+            results = self.import_accounts([
+                'first@test.com,new,student,student,,',
+                'second@test.com,new,student,student,,',
+                'third@test.com,new,student,student,,',
+            ]).context['results']
+        self.assertEqual(results['created'], 2)
+        self.assertEqual([(error['line'], error['email']) for error in results['errors']], [(3, 'second@test.com')])
+        self.assertTrue(StudentProfile.objects.filter(user__email='third@test.com').exists())
+
+    def test_import_accounts_other_constraint(self):
+        self.login(self.admin)
+        # a failed constraint that isn't a taken email is reported as it is
+        with mock.patch.object(Onboarding, '_insert', side_effect=IntegrityError('CHECK constraint failed: hs')):
+            results = self.import_accounts([
+                'first@test.com,new,student,student,,',
+                'second@test.com,new,student,student,,',
+            ]).context['results']
+        self.assertEqual(results['created'], 0)
+        self.assertEqual([error['error'] for error in results['errors']], ['CHECK constraint failed: hs'] * 2)
+
+    def test_import_accounts_missing_columns(self):
+        self.login(self.admin)
+        response = self.client.post(reverse('import_accounts'), {
+            'file': SimpleUploadedFile('roster.csv', b'email,name\nnew@test.com,new', content_type='text/csv')})
+        self.assertEqual(response.context['results']['errors'][0]['error'],
+                         'Missing columns: first_name, last_name, account_type')
+        self.assertFalse(EmployerProfile.objects.filter(user__email='new@test.com').exists())
+
+    def test_import_accounts_admin_only(self):
+        self.login(self.student)
+        self.assertEqual(self.import_accounts([]).status_code, 403)
@@ -1,14 +1,17 @@
-from django.views.generic import CreateView, ListView, DetailView
+from django.views.generic import CreateView, ListView, DetailView, FormView
 from django.urls import reverse_lazy, reverse
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
 
 from mixins.admin_required import AdminRequiredMixin
+from mixins.keyset_pagination import KeysetPaginationMixin
 from careers.models import Career
 from accounts.models import User
 from decorators.admin_required import admin_required
 
-from helpers.paginate import paginate
+from helpers.paginate import paginate, page_links
+from .forms import ImportAccountsForm
+from .onboarding import import_accounts
 
 class CareerInfoFormView(AdminRequiredMixin, CreateView):
     template_name = 'interniac-admin/new-career.html'
@@ -16,9 +19,10 @@ class CareerInfoFormView(AdminRequiredMixin, CreateView):
     fields = ['content']
     success_url = reverse_lazy('success')
 
-class AllUsers(AdminRequiredMixin, ListView):
-    model = User
+class AllUsers(AdminRequiredMixin, KeysetPaginationMixin, ListView):
+    queryset = User.objects.with_profiles()
     paginate_by = 30
+    keyset_ordering = ('-date_joined', '-id')
     template_name = 'interniac-admin/all-users.html'
 
     def get_context_data(self, **kwargs):
@@ -29,11 +33,23 @@ class AllUsers(AdminRequiredMixin, ListView):
 
         pages = paginate(context)
 
-        context.update({'pages': pages})
+        context.update({'pages': pages, 'page_links': page_links(context)})
         return context
 
+class ImportAccounts(AdminRequiredMixin, FormView):
+    """
+    Create the accounts in a school's roster from a CSV, the results and the rows that couldn't be imported
+    are shown on the same page. Use the `import_accounts` command for files too big to upload
+    """
+    form_class = ImportAccountsForm
+    template_name = 'interniac-admin/import-accounts.html'
+
+    def form_valid(self, form):
+        results = import_accounts(form.cleaned_data['file'].file)
+        return self.render_to_response(self.get_context_data(form=ImportAccountsForm(), results=results))
+
 class UserInfo(AdminRequiredMixin, DetailView):
-    model = User
+    queryset = User.objects.with_profiles()
     template_name = 'interniac-admin/user-info/user-info.html'
 
 @login_required
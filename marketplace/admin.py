@@ -1,13 +1,27 @@
 from django.contrib import admin
 
-from .models import Listing, Career
+from .models import Listing, Career, Application, ApplicationEvent
+
+
+class ApplicationInline(admin.TabularInline):
+    model = Application
+    raw_id_fields = ['student']
+    extra = 0
 
 
 class ListingAdmin(admin.ModelAdmin):
-    filter_horizontal = ['applications', 'acceptances', 'rejections', 'interview_requests', 'employer_acceptances', 'employer_rejections', 'employer_interview_requests',
-                         'student_acceptances', 'student_rejections', 'student_interview_requests', 'awaiting_confirm_acceptance', 'already_applied'
-                         ]
+    inlines = [ApplicationInline]
+
+
+class ApplicationEventAdmin(admin.ModelAdmin):
+    list_display = ('listing', 'student', 'transition', 'from_status', 'to_status', 'actor', 'created')
+    list_filter = ('transition',)
+    raw_id_fields = ['listing', 'student', 'actor']
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 admin.site.register(Listing, ListingAdmin)
+admin.site.register(ApplicationEvent, ApplicationEventAdmin)
 admin.site.register(Career)
@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from accounts.models import EmployerProfile
+from helpers.cache import get_version, bump_version
+
+
+"""
+Cached choices for the marketplace `Filter` form
+The career and company fields are rendered once and kept in the cache, every key includes a version that's
+bumped by the `invalidate_filter_choices` signals when a career or a company is saved or deleted.
+Once there are more than `COMPANY_DROPDOWN_LIMIT` companies the company dropdown is replaced by a typeahead
+that looks companies up with `company_typeahead`
+
+"""
+
+FIELDS = ('career', 'company')
+
+TIMEOUT = 60 * 60 * 24
+
+COMPANY_DROPDOWN_LIMIT = 200
+
+TYPEAHEAD_LIMIT = 10
+
+VERSION = 'marketplace:choices'
+
+
+def _key(version, name) -> str:
+    return f'marketplace:choices:{version}:{name}'
+
+
+def choices_version() -> int:
+    """
+    The current version of the cached choices
+    """
+    return get_version(VERSION)
+
+
+def invalidate_choices() -> None:
+    """
+    Start a new version of the cached choices, the old fragments are never read again and expire
+    """
+    bump_version(VERSION)
+
+
+def _render(form, name) -> str:
+    if name == 'company' and EmployerProfile.objects.count() > COMPANY_DROPDOWN_LIMIT:
+        return render_to_string('marketplace/company-typeahead.html', {'field': form['company']})
+    return str(form[name])
+
+
+def filter_choices(form) -> dict:
+    """
+    The rendered career and company fields of a `Filter` form, only the fields that aren't cached are rendered
+
+    @type form: `Filter`  
+    @param form: an unbound filter form  
+    @rtype: `dict`
+    @return: the html of every field in `FIELDS`
+    """
+    version = choices_version()
+    cached = cache.get_many([_key(version, name) for name in FIELDS])
+    choices = {}
+    for name in FIELDS:
+        html = cached.get(_key(version, name))
+        if html is None:
+            html = _render(form, name)
+            cache.set(_key(version, name), html, TIMEOUT)
+        choices[name] = mark_safe(html)
+    return choices
+
+
+def company_typeahead(query, limit=TYPEAHEAD_LIMIT) -> list:
+    """
+    Companies whose name starts with `query`, on Postgres the lookup is served by the
+    `employer_company_name_upper` index (accounts migration 0013)
+
+    @type query: `str`  
+    @param query: the start of the company's name  
+    @rtype: `list`
+    @return: the `id` (the filter value) and `name` of up to `limit` companies
+    """
+    if not query:
+        return []
+    companies = (EmployerProfile.objects.filter(company_name__istartswith=query)
+                 .order_by('company_name').values_list('user_id', 'company_name')[:limit])
+    return [{'id': company_id, 'name': name} for company_id, name in companies]
@@ -0,0 +1,42 @@
+# Generated by Django 3.1.9 on 2026-10-18 09:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('marketplace', '0023_listing_already_applied'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Application',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Applied', 'Applied'), ('Interview', 'Interview requested'), ('Awaiting', 'Awaiting confirmation'), ('Accepted', 'Accepted'), ('Rejected', 'Rejected'), ('Declined', 'Declined'), ('Withdrawn', 'Withdrawn')], default='Applied', max_length=20)),
+                ('employer_archived', models.BooleanField(default=False)),
+                ('student_archived', models.BooleanField(default=False)),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated', models.DateTimeField(default=django.utils.timezone.now)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='marketplace.listing')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['listing', 'status'], name='application_listing_status'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['student', 'status'], name='application_student_status'),
+        ),
+        migrations.AddConstraint(
+            model_name='application',
+            constraint=models.UniqueConstraint(fields=('listing', 'student'), name='unique_listing_student_application'),
+        ),
+    ]
@@ -0,0 +1,103 @@
+from django.db import migrations
+from django.utils import timezone
+
+APPLIED = 'Applied'
+INTERVIEW = 'Interview'
+AWAITING = 'Awaiting'
+ACCEPTED = 'Accepted'
+REJECTED = 'Rejected'
+DECLINED = 'Declined'
+
+# statuses that each side could archive, and the field that held them
+ARCHIVABLE = {ACCEPTED: 'acceptances', REJECTED: 'rejections', INTERVIEW: 'interview_requests'}
+
+STATE_FIELDS = ('applications', 'acceptances', 'rejections', 'interview_requests', 'awaiting_confirm_acceptance',
+                'already_applied', 'employer_acceptances', 'employer_rejections', 'employer_interview_requests',
+                'student_acceptances', 'student_rejections', 'student_interview_requests')
+
+
+def _members(Listing, field):
+    """Set of (listing id, student id) pairs in one of the old ManyToMany tables"""
+    through = getattr(Listing, field).through
+    return set(through.objects.values_list('listing_id', 'user_id'))
+
+
+def copy_state_to_applications(apps, schema_editor):
+    Listing = apps.get_model('marketplace', 'Listing')
+    Application = apps.get_model('marketplace', 'Application')
+    members = {field: _members(Listing, field) for field in STATE_FIELDS}
+
+    def status(pair):
+        # every old transition took the student out of `applications`, so a student who is still in it
+        # applied again after being rejected or accepted, and the live application is the latest state
+        if pair in members['applications']:
+            if pair in members['interview_requests']:
+                return INTERVIEW
+            return APPLIED
+        if pair in members['acceptances']:
+            return ACCEPTED
+        if pair in members['awaiting_confirm_acceptance']:
+            return AWAITING
+        if pair in members['rejections']:
+            return REJECTED
+        # only left in `already_applied`, they declined the offer
+        return DECLINED
+
+    def archived(pair, status, side):
+        if status not in ARCHIVABLE:
+            return False
+        return pair not in members[f'{side}_{ARCHIVABLE[status]}']
+
+    now = timezone.now()
+    applications = []
+    for pair in sorted(set().union(*members.values())):
+        pair_status = status(pair)
+        applications.append(Application(
+            listing_id=pair[0],
+            student_id=pair[1],
+            status=pair_status,
+            employer_archived=archived(pair, pair_status, 'employer'),
+            student_archived=archived(pair, pair_status, 'student'),
+            created=now,
+            updated=now
+        ))
+    Application.objects.bulk_create(applications, batch_size=1000)
+
+
+def copy_applications_to_state(apps, schema_editor):
+    Listing = apps.get_model('marketplace', 'Listing')
+    Application = apps.get_model('marketplace', 'Application')
+    fields = {
+        APPLIED: ['applications'],
+        INTERVIEW: ['applications', 'interview_requests'],
+        AWAITING: ['awaiting_confirm_acceptance'],
+        ACCEPTED: ['acceptances'],
+        REJECTED: ['rejections'],
+    }
+    rows = {field: [] for field in STATE_FIELDS}
+
+    for application in Application.objects.all().iterator():
+        pair = {'listing_id': application.listing_id, 'user_id': application.student_id}
+        rows['already_applied'].append(pair)
+        for field in fields.get(application.status, []):
+            rows[field].append(pair)
+        if application.status in ARCHIVABLE:
+            if not application.employer_archived:
+                rows[f'employer_{ARCHIVABLE[application.status]}'].append(pair)
+            if not application.student_archived:
+                rows[f'student_{ARCHIVABLE[application.status]}'].append(pair)
+
+    for field, pairs in rows.items():
+        through = getattr(Listing, field).through
+        through.objects.bulk_create([through(**pair) for pair in pairs], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0024_application'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_state_to_applications, copy_applications_to_state),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 3.1.9 on 2026-10-18 09:49
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0025_copy_application_state'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='listing',
+            name='acceptances',
+        ),
+        migrations.RemoveField(
+            model_name='listing',
+            name='already_applied',
+        ),
+        migrations.RemoveField(
+            model_name='listing',
+            name='applications',
+        ),
+        migrations.RemoveField(
+            model_name='listing',
+            name='awaiting_confirm_acceptance',
+        ),
+        migrations.RemoveField(
+            model_name='listing',
+            name='employer_acceptances',
+        ),
+        migrations.RemoveField(
+            model_name='listing',
+            name='employer_interview_requests',
+        ),
+        migrations.RemoveField(
+            model_name='listing',
+            name='employer_rejections',
+        ),
+        migrations.RemoveField(
+            model_name='listing',
+            name='interview_requests',
+        ),
+        migrations.RemoveField(
+            model_name='listing',
+            name='rejections',
+        ),
+        migrations.RemoveField(
+            model_name='listing',
+            name='student_acceptances',
+        ),
+        migrations.RemoveField(
+            model_name='listing',
+            name='student_interview_requests',
+        ),
+        migrations.RemoveField(
+            model_name='listing',
+            name='student_rejections',
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.1.9 on 2026-10-18 09:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0026_remove_listing_state_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingSearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, max_length=50)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='marketplace.listing')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='listingsearchterm',
+            constraint=models.UniqueConstraint(fields=('listing', 'term'), name='unique_listing_search_term'),
+        ),
+    ]
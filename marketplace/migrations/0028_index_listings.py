@@ -0,0 +1,58 @@
+import re
+
+from django.db import migrations
+
+
+# a copy of `marketplace.search` when the index was created, so changing the search doesn't change this migration
+TERM_PATTERN = re.compile(r'\w+')
+MAX_TERM_LENGTH = 50
+
+TITLE_WEIGHT = 4
+CAREER_WEIGHT = 2
+COMPANY_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+
+def tokenize(text) -> set:
+    if not text:
+        return set()
+    return {term[:MAX_TERM_LENGTH] for term in TERM_PATTERN.findall(text.lower())}
+
+
+def listing_terms(title, description, career, company_name) -> dict:
+    """
+    Weighted search terms for a listing, a term that appears in several fields adds up their weights
+    """
+    terms = {}
+    for text, weight in ((title, TITLE_WEIGHT), (career, CAREER_WEIGHT),
+                         (company_name, COMPANY_WEIGHT), (description, DESCRIPTION_WEIGHT)):
+        for term in tokenize(text):
+            terms[term] = terms.get(term, 0) + weight
+    return terms
+
+
+def index_listings(apps, schema_editor):
+    Listing = apps.get_model('marketplace', 'Listing')
+    ListingSearchTerm = apps.get_model('marketplace', 'ListingSearchTerm')
+    EmployerProfile = apps.get_model('accounts', 'EmployerProfile')
+    company_names = dict(EmployerProfile.objects.values_list('user_id', 'company_name'))
+
+    terms = []
+    for listing in Listing.objects.select_related('career').iterator():
+        career = listing.career.career if listing.career_id else None
+        weighted = listing_terms(listing.title, listing.description, career, company_names.get(listing.company_id))
+        terms.extend(ListingSearchTerm(listing_id=listing.id, term=term, weight=weight)
+                     for term, weight in weighted.items())
+    ListingSearchTerm.objects.bulk_create(terms, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_auto_20210504_2218'),
+        ('marketplace', '0027_listingsearchterm'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_listings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.9 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0028_index_listings'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['posted', 'id'], name='listing_posted_id'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    The notifications app belongs to django-notifications, so the index is created with SQL
+    instead of being declared on the model
+    """
+
+    dependencies = [
+        ('marketplace', '0029_keyset_pagination_indexes'),
+        ('notifications', '0008_index_together_recipient_unread'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX notification_recipient_unread_actor ON notifications_notification '
+            '(recipient_id, unread, actor_content_type_id, actor_object_id, action_object_object_id)',
+            'DROP INDEX notification_recipient_unread_actor',
+        ),
+    ]
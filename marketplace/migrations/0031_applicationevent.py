@@ -0,0 +1,40 @@
+# Generated by Django 3.1.9 on 2026-10-18 10:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('marketplace', '0030_notification_unread_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transition', models.CharField(max_length=30)),
+                ('from_status', models.CharField(blank=True, choices=[('Applied', 'Applied'), ('Interview', 'Interview requested'), ('Awaiting', 'Awaiting confirmation'), ('Accepted', 'Accepted'), ('Rejected', 'Rejected'), ('Declined', 'Declined'), ('Withdrawn', 'Withdrawn')], max_length=20, null=True)),
+                ('to_status', models.CharField(choices=[('Applied', 'Applied'), ('Interview', 'Interview requested'), ('Awaiting', 'Awaiting confirmation'), ('Accepted', 'Accepted'), ('Rejected', 'Rejected'), ('Declined', 'Declined'), ('Withdrawn', 'Withdrawn')], max_length=20)),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('latency', models.DurationField(blank=True, null=True)),
+                ('dwell', models.DurationField(blank=True, null=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='application_events', to='marketplace.listing')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='applicationevent',
+            index=models.Index(fields=['listing', 'student', 'created'], name='application_event_history'),
+        ),
+        migrations.AddIndex(
+            model_name='applicationevent',
+            index=models.Index(fields=['transition', 'created'], name='application_event_transition'),
+        ),
+    ]
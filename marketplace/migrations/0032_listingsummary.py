@@ -0,0 +1,26 @@
+# Generated by Django 3.1.9 on 2026-10-18 10:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0031_applicationevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingSummary',
+            fields=[
+                ('listing', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='marketplace.listing')),
+                ('applied', models.PositiveIntegerField(default=0)),
+                ('interviewing', models.PositiveIntegerField(default=0)),
+                ('awaiting', models.PositiveIntegerField(default=0)),
+                ('accepted', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+FIELDS = {
+    'Applied': 'applied',
+    'Interview': 'interviewing',
+    'Awaiting': 'awaiting',
+    'Accepted': 'accepted',
+    'Rejected': 'rejected',
+}
+
+
+def summarize_listings(apps, schema_editor):
+    Listing = apps.get_model('marketplace', 'Listing')
+    Application = apps.get_model('marketplace', 'Application')
+    ListingSummary = apps.get_model('marketplace', 'ListingSummary')
+
+    summaries = {listing_id: ListingSummary(listing_id=listing_id)
+                 for listing_id in Listing.objects.values_list('id', flat=True)}
+    counts = (Application.objects.filter(status__in=FIELDS).values_list('listing_id', 'status')
+              .annotate(Count('id')).order_by())
+    for listing_id, status, count in counts:
+        setattr(summaries[listing_id], FIELDS[status], count)
+    activity = Application.objects.values_list('listing_id').annotate(Max('updated')).order_by()
+    for listing_id, last_activity in activity:
+        summaries[listing_id].last_activity = last_activity
+    ListingSummary.objects.bulk_create(summaries.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0032_listingsummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(summarize_listings, migrations.RunPython.noop),
+    ]
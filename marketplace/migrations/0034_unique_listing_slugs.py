@@ -0,0 +1,47 @@
+from django.db import migrations
+from django.template.defaultfilters import slugify
+
+
+MAX_LENGTH = 50
+
+
+def allocate(title, taken) -> str:
+    """
+    The first free slug of `title`, `title`, `title-2`, `title-3`...
+    """
+    original = slugify(title)[:MAX_LENGTH].strip('-')
+    slug = original
+    suffix = 2
+    while not slug or slug in taken:
+        end = f'-{suffix}'
+        slug = f"{original[:MAX_LENGTH - len(end)].strip('-')}{end}"
+        suffix += 1
+    taken.add(slug)
+    return slug
+
+
+def unique_slugs(apps, schema_editor):
+    """
+    Give a new slug to the listings without one and to every listing but the first with the same slug
+    """
+    Listing = apps.get_model('marketplace', 'Listing')
+    taken = set(Listing.objects.exclude(slug='').values_list('slug', flat=True))
+    seen = set()
+    changed = []
+    for listing in Listing.objects.only('id', 'title', 'slug').order_by('id').iterator():
+        if not listing.slug or listing.slug in seen:
+            listing.slug = allocate(listing.title, taken)
+            changed.append(listing)
+        seen.add(listing.slug)
+    Listing.objects.bulk_update(changed, ['slug'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0033_summarize_listings'),
+    ]
+
+    operations = [
+        migrations.RunPython(unique_slugs, migrations.RunPython.noop),
+    ]
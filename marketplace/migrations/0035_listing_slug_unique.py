@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0034_unique_listing_slugs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='listing',
+            name='slug',
+            field=models.SlugField(blank=True, unique=True),
+        ),
+    ]
@@ -1,10 +1,18 @@
+from time import perf_counter
+from datetime import timedelta
+
 from notifications.signals import notify
 
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Greatest
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
+from helpers.slugs import save_with_unique_slug
+from .notifications import has_unread_application
+
 
 INTERN_TYPES = (
     ('Paid', 'Paid'),
@@ -17,6 +25,24 @@ INTERN_WHERE = (
 )
 
 
+class ListingQuerySet(models.QuerySet):
+
+    def with_application_status(self, user):
+        """
+        Annotate every listing with the status of the user's application as `application_status`,
+        computed in the same query as the listings
+
+        @type user: `User`
+        @param user: the current user
+        @returns: listings annotated with `application_status`, `None` where the user never applied
+        """
+        if not user.is_authenticated or not user.is_student:
+            return self
+
+        applications = Application.objects.filter(listing=OuterRef('pk'), student=user)
+        return self.annotate(application_status=Subquery(applications.values('status')[:1]))
+
+
 class Listing(models.Model):
     company = models.ForeignKey(
         'accounts.User', on_delete=models.CASCADE, related_name='listing')
@@ -32,50 +58,76 @@ class Listing(models.Model):
     application_deadline = models.DateTimeField()
     description = models.TextField()
 
+    application_url = models.URLField(blank=True, null=True)
+    posted = models.DateField(default=timezone.now, blank=True)
+    slug = models.SlugField(max_length=50, unique=True, blank=True)
+
+    objects = ListingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # keyset pagination of the marketplace
+            models.Index(fields=['posted', 'id'], name='listing_posted_id')
+        ]
+
+    # the state of every student's application is kept in one `Application` row per listing and student,
+    # the properties below expose the students in each stage of the pipeline
+
+    def _students(self, statuses, archived_by=None):
+        applications = self.application_set.filter(status__in=statuses)
+        if archived_by is not None:
+            applications = applications.filter(**{f'{archived_by}_archived': False})
+        return get_user_model().objects.filter(id__in=applications.values('student_id'))
+
+    @property
+    def applications(self):
+        return self._students(Application.OPEN)
+
+    @property
+    def interview_requests(self):
+        return self._students([Application.INTERVIEW])
+
+    @property
+    def awaiting_confirm_acceptance(self):
+        return self._students([Application.AWAITING])
+
+    @property
+    def acceptances(self):
+        return self._students([Application.ACCEPTED])
+
+    @property
+    def rejections(self):
+        return self._students([Application.REJECTED])
+
     # students that have been accepted, rejected and requested
     # visible on the employer's account
-    # needed in order to archive accepted/rejected student without affecting other accounts viewing the same field
-    employer_acceptances = models.ManyToManyField(
-        'accounts.User', related_name='employer_acceptances', blank=True)
-    employer_rejections = models.ManyToManyField(
-        'accounts.User', related_name='employer_rejections', blank=True)
-    employer_interview_requests = models.ManyToManyField('accounts.User', related_name='employer_interview_requests',
-                                                         blank=True)
+
+    @property
+    def employer_acceptances(self):
+        return self._students([Application.ACCEPTED], archived_by='employer')
+
+    @property
+    def employer_rejections(self):
+        return self._students([Application.REJECTED], archived_by='employer')
+
+    @property
+    def employer_interview_requests(self):
+        return self._students([Application.INTERVIEW], archived_by='employer')
 
     # students that have been accepted, rejected and requested
     # visible on the student's account
-    # needed in order to archive the students acceptance/rejection/request without affecting other accounts viewing the same field
-    student_acceptances = models.ManyToManyField(
-        'accounts.User', related_name='student_acceptances', blank=True)
-    student_rejections = models.ManyToManyField(
-        'accounts.User', related_name='student_rejections', blank=True)
-    student_interview_requests = models.ManyToManyField('accounts.User', related_name='student_interview_requests',
-                                                        blank=True)
-                                                        
-    # constant acceptances, rejections and requests
-    # these are not viewed on any account
-    # needed in order to create status updates
-    acceptances = models.ManyToManyField(
-        'accounts.User', related_name='listing_acceptances', blank=True)
-    rejections = models.ManyToManyField(
-        'accounts.User', related_name='listing_rejections', blank=True)
-    interview_requests = models.ManyToManyField(
-        'accounts.User', related_name='interviews', blank=True)
-
-    # if all of the above was one group of fields, users would be affected by another users actions so
-    # the state of a users application is kept in an isolated group
-
-    awaiting_confirm_acceptance = models.ManyToManyField(
-        'accounts.User', related_name='awaiting_confirm_acceptance', blank=True
-    )
-    applications = models.ManyToManyField(
-        'accounts.User', related_name='applications', blank=True)
 
-    application_url = models.URLField(blank=True, null=True)
-    posted = models.DateField(default=timezone.now, blank=True)
-    slug = models.SlugField(max_length=50, unique=False, blank=True)
+    @property
+    def student_acceptances(self):
+        return self._students([Application.ACCEPTED], archived_by='student')
+
+    @property
+    def student_rejections(self):
+        return self._students([Application.REJECTED], archived_by='student')
 
-    already_applied = models.ManyToManyField('accounts.User', related_name='already_applied', blank=True)
+    @property
+    def student_interview_requests(self):
+        return self._students([Application.INTERVIEW], archived_by='student')
 
     @property
     def summarize(self):
@@ -87,9 +139,10 @@ class Listing(models.Model):
             'pay': self.pay,
             'time_commitment': self.time_commitment,
             'location': self.location,
-            'applications': [application for application in self.applications.all()],
-            'rejections': [rejection for rejection in self.rejections.all()],
-            'interview requests': [request for request in self.interview_requests.all()],
+            'applications': self.summary.open,
+            'rejections': self.summary.rejected,
+            'interview requests': self.summary.interviewing,
+            'last activity': self.summary.last_activity,
             'application url': self.application_url,
             'posted': self.posted,
             'slug': self.slug
@@ -100,95 +153,414 @@ class Listing(models.Model):
     def get_absolute_url(self):
         return reverse('listing', kwargs={'slug': self.slug})
 
+    def save(self, *args, **kwargs):
+        """
+        A new listing gets a unique slug of its title when it's inserted, the slug stays the same when the title
+        is edited so its links keep working
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        save_with_unique_slug(self, self.title, lambda: super(Listing, self).save(*args, **kwargs))
+
+    def status_for(self, student):
+        """
+        The status of a student's application for this listing, a single index probe
+
+        @param student: the student, or the id of the student
+        @rtype: `str`
+        @returns: the status of the application or `None` if the student never applied
+        """
+        applications = self.application_set.filter(student_id=getattr(student, 'pk', student))
+        return applications.values_list('status', flat=True).first()
+
+    def has_applicant(self, student, statuses=None) -> bool:
+        """
+        Check if a student has an application for this listing with an `EXISTS` query
+
+        @param student: the student, or the id of the student
+        @type statuses: `list`
+        @param statuses: if set, the application must be in one of these statuses
+        """
+        applications = self.application_set.filter(student_id=getattr(student, 'pk', student))
+        if statuses is not None:
+            applications = applications.filter(status__in=statuses)
+        return applications.exists()
+
     def has_student_already_applied(self, student) -> bool:
-        return student in self.already_applied.all()
+        return self.has_applicant(student)
 
     def apply(self, student):
-        self.add_application(student)
-        if not self.has_student_already_applied(student):
-            self.already_applied.add(student)
-            
-        if self.company.notifications.unread().filter(actor_object_id=self.id).filter(action_object_object_id=student.id).count() != 0:
+        start = perf_counter()
+        with transaction.atomic():
+            application, created = Application.objects.get_or_create(listing=self, student=student)
+            if created:
+                ApplicationEvent.objects.create(listing=self, student=student, actor=student, transition='apply',
+                                                to_status=Application.APPLIED, created=application.created,
+                                                latency=timedelta(seconds=perf_counter() - start))
+                ListingSummary.record([(self.id, None, Application.APPLIED)], application.created)
+            else:
+                self._transition([student], 'apply')
+
+        if has_unread_application(self, student):
             return
 
         notify.send(recipient=self.company, verb='someone applied!', actor=self, sender=self, action_object=student)
 
     def unapply(self, student):
-        self.remove_application(student)
-        if student in self.interview_requests.all():
-            self.interview_requests.remove(student)
-        if student in self.student_interview_requests.all():
-            self.student_interview_requests.remove(student)
-        if student in self.employer_interview_requests.all():
-            self.employer_interview_requests.remove(student)
+        self._transition([student], 'unapply')
+
+    def _transition(self, students, name, actor=None) -> list:
+        """
+        Make a transition for students' applications for this listing, see `ApplicationQuerySet.transition`
 
-    def add_application(self, student):
-        self.applications.add(student)
+        @param students: the students, or the ids of the students
+        @param name: the name of the transition in `Application.TRANSITIONS`
+        @param actor: the user making the transition, the student or the company by default
+        @rtype: `list`
+        @returns: the ids of the students whose applications made the transition
+        """
+        student_ids = [getattr(student, 'pk', student) for student in students]
+        return self.application_set.filter(student_id__in=student_ids).transition(name, actor)
 
-    def remove_application(self, student):
-        self.applications.remove(student)
+    def _archive(self, student, status, side):
+        return self.application_set.filter(student=student, status=status).update(**{f'{side}_archived': True})
 
     def archive_student_acceptance(self, student):
-        self.student_acceptances.remove(student)
+        self._archive(student, Application.ACCEPTED, 'student')
 
     def archive_student_rejection(self, student):
-        self.student_rejections.remove(student)
+        self._archive(student, Application.REJECTED, 'student')
 
     def archive_interview_request(self, student):
-        self.student_interview_requests.remove(student)
+        self._archive(student, Application.INTERVIEW, 'student')
+
+    def archive_employer_acceptance(self, student):
+        self._archive(student, Application.ACCEPTED, 'employer')
+
+    def archive_employer_rejection(self, student):
+        self._archive(student, Application.REJECTED, 'employer')
+
+    def archive_employer_interview_request(self, student):
+        self._archive(student, Application.INTERVIEW, 'employer')
 
     def check_if_accepted(self, user):
-        return user in self.awaiting_confirm_acceptance.all()
+        return self.has_applicant(user, [Application.AWAITING])
 
     def remove_from_interview(self, student):
-        if student in self.interview_requests.all():
-            self.interview_requests.remove(student)
-        if student in self.student_interview_requests.all():
-            self.student_interview_requests.remove(student)
-        if student in self.employer_interview_requests.all():
-            self.employer_interview_requests.remove(student)
+        self._transition([student], 'remove_from_interview')
 
     def decline_acceptance(self, student):
-        self.awaiting_confirm_acceptance.remove(student)
+        self._transition([student], 'decline')
+
+    def confirm_acceptance(self, student) -> bool:
+        """
+        Accept the offer for this listing and withdraw every other open application and pending offer
+        of the student, in one transaction. The student's pending applications are locked first,
+        so two confirmations at the same time can't both go through or withdraw each other.
 
-    def confirm_acceptance(self, student):
-        for listing in student.applications.all():
-            listing.remove_application(student)
+        @param student: the student confirming the offer
+        @rtype: `bool`
+        @returns: if the offer was confirmed, `False` if there was no offer waiting for confirmation
+        """
+        with transaction.atomic():
+            pending = dict(Application.objects.select_for_update()
+                           .filter(student=student, status__in=Application.PENDING)
+                           .order_by('id').values_list('listing_id', 'id'))
+            if self.id not in pending or not self._transition([student], 'confirm'):
+                return False
 
-        for listing in student.awaiting_confirm_acceptance.all():
-            listing.awaiting_confirm_acceptance.remove(student)
+            others = [application_id for listing_id, application_id in pending.items() if listing_id != self.id]
+            Application.objects.filter(id__in=others).transition('withdraw')
+        return True
 
-        self.awaiting_confirm_acceptance.remove(student)
-        self.acceptances.add(student)
-        self.employer_acceptances.add(student)
-        self.student_acceptances.add(student)
-        
-    def accept(self, student):
-        self.applications.remove(student)
-        self.awaiting_confirm_acceptance.add(student)
-        self.remove_from_interview(student)
+    def accept(self, student, actor=None):
+        self._transition([student], 'accept', actor)
 
-    def reject(self, student_id):
-        user = get_user_model().objects.get(id=student_id)
+    def reject(self, student, actor=None):
+        self._transition([student], 'reject', actor)
 
-        self.applications.remove(user)
-        self.rejections.add(user)
-        self.employer_rejections.add(user)
-        self.student_rejections.add(user)
+    def request_interview(self, student, actor=None):
+        self._transition([student], 'request_interview', actor)
 
-        self.remove_from_interview(user.id)
+    def bulk_accept(self, student_ids, actor=None) -> list:
+        return self._transition(student_ids, 'accept', actor)
 
-    def request_interview(self, student_id):
-        user = get_user_model().objects.get(id=student_id)
+    def bulk_reject(self, student_ids, actor=None) -> list:
+        return self._transition(student_ids, 'reject', actor)
 
-        self.interview_requests.add(user)
-        self.employer_interview_requests.add(user)
-        self.student_interview_requests.add(user)
+    def bulk_request_interview(self, student_ids, actor=None) -> list:
+        return self._transition(student_ids, 'request_interview', actor)
 
     def __str__(self):
         return self.title
 
 
+class ApplicationQuerySet(models.QuerySet):
+
+    def transition(self, name, actor=None) -> list:
+        """
+        Make a transition for every application in the queryset that is in one of the transition's statuses,
+        applications in any other status are skipped. The applications are locked, updated in one statement
+        and an `ApplicationEvent` is logged for each of them, all in one transaction.
+
+        @type name: `str`
+        @param name: the name of the transition in `Application.TRANSITIONS`
+        @param actor: the user making the transition, or their id. By default the student for
+        the student's transitions and the listing's company for the employer's
+        @rtype: `list`
+        @returns: the ids of the students whose applications made the transition
+        """
+        statuses, status, side = Application.TRANSITIONS[name]
+        # the latency includes waiting for the locks
+        start = perf_counter()
+        with transaction.atomic():
+            applications = list(self.select_for_update(of=('self',))
+                                .filter(status__in=[current for current in statuses if current is not None])
+                                .order_by('id')
+                                .values_list('id', 'listing_id', 'student_id', 'status', 'updated',
+                                             'listing__company_id'))
+            if not applications:
+                return []
+
+            now = timezone.now()
+            Application.objects.filter(id__in=[application[0] for application in applications]).update(
+                status=status, employer_archived=False, student_archived=False, updated=now)
+            latency = timedelta(seconds=perf_counter() - start)
+
+            events = []
+            for _, listing_id, student_id, current, updated, company_id in applications:
+                actor_id = getattr(actor, 'pk', actor) or (student_id if side == 'student' else company_id)
+                events.append(ApplicationEvent(listing_id=listing_id, student_id=student_id, actor_id=actor_id,
+                                               transition=name, from_status=current, to_status=status,
+                                               created=now, dwell=now - updated, latency=latency))
+            ApplicationEvent.objects.bulk_create(events)
+            ListingSummary.record([(event.listing_id, event.from_status, event.to_status) for event in events], now)
+        return [application[2] for application in applications]
+
+
+class Application(models.Model):
+    """
+    The state of a student's application for a listing.  
+    There is at most one application per listing and student, every action on the application updates this row.
+    """
+
+    APPLIED = 'Applied'
+    INTERVIEW = 'Interview'
+    AWAITING = 'Awaiting'
+    ACCEPTED = 'Accepted'
+    REJECTED = 'Rejected'
+    DECLINED = 'Declined'
+    WITHDRAWN = 'Withdrawn'
+
+    STATUSES = (
+        (APPLIED, 'Applied'),
+        (INTERVIEW, 'Interview requested'),
+        (AWAITING, 'Awaiting confirmation'),
+        (ACCEPTED, 'Accepted'),
+        (REJECTED, 'Rejected'),
+        (DECLINED, 'Declined'),
+        (WITHDRAWN, 'Withdrawn')
+    )
+
+    # applications that the employer still has to respond to
+    OPEN = (APPLIED, INTERVIEW)
+    # applications that are withdrawn when the student confirms an acceptance
+    PENDING = (APPLIED, INTERVIEW, AWAITING)
+
+    # every transition an application can make: the statuses it can start from (`None` when the student
+    # hasn't applied yet), the status it moves to and which side makes it
+    TRANSITIONS = {
+        'apply': ((None, REJECTED, DECLINED, WITHDRAWN), APPLIED, 'student'),
+        'unapply': (OPEN, WITHDRAWN, 'student'),
+        'request_interview': ((APPLIED,), INTERVIEW, 'employer'),
+        'remove_from_interview': ((INTERVIEW,), APPLIED, 'employer'),
+        'accept': (OPEN, AWAITING, 'employer'),
+        'reject': (PENDING, REJECTED, 'employer'),
+        'decline': ((AWAITING,), DECLINED, 'student'),
+        'confirm': ((AWAITING,), ACCEPTED, 'student'),
+        'withdraw': (PENDING, WITHDRAWN, 'student'),
+    }
+
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE)
+    student = models.ForeignKey('accounts.User', on_delete=models.CASCADE)
+    status = models.CharField(choices=STATUSES, default=APPLIED, max_length=20)
+
+    # accepted, rejected and requested applications can be archived by the employer and the student
+    # independently without affecting what the other account sees
+    employer_archived = models.BooleanField(default=False)
+    student_archived = models.BooleanField(default=False)
+
+    created = models.DateTimeField(default=timezone.now)
+    updated = models.DateTimeField(default=timezone.now)
+
+    objects = ApplicationQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['listing', 'student'], name='unique_listing_student_application')
+        ]
+        indexes = [
+            models.Index(fields=['listing', 'status'], name='application_listing_status'),
+            models.Index(fields=['student', 'status'], name='application_student_status')
+        ]
+
+    def __str__(self):
+        return f'{self.student} - {self.listing} ({self.status})'
+
+
+class ApplicationEventQuerySet(models.QuerySet):
+
+    def history(self, listing, student):
+        """
+        Every transition a student's application for a listing made, oldest first
+        """
+        return self.filter(listing=listing, student=student).order_by('created', 'id')
+
+    def metrics(self) -> dict:
+        """
+        The number of times every transition was made, how long it took and how long applications
+        stayed in their previous status before it
+
+        @rtype: `dict`
+        @returns: `count`, `average_latency`, `max_latency`, `average_dwell` and `max_dwell` by transition name
+        """
+        rows = (self.values('transition').order_by()
+                .annotate(count=models.Count('id'),
+                          average_latency=models.Avg('latency'), max_latency=models.Max('latency'),
+                          average_dwell=models.Avg('dwell'), max_dwell=models.Max('dwell')))
+        return {row.pop('transition'): row for row in rows}
+
+
+class ApplicationEvent(models.Model):
+    """
+    A transition an application made. Events are only ever added, so the whole pipeline can be replayed
+    from them, the current state of an application is its `Application.status`.
+    """
+
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name='application_events')
+    student = models.ForeignKey('accounts.User', on_delete=models.CASCADE, related_name='+')
+    actor = models.ForeignKey('accounts.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    transition = models.CharField(max_length=30)
+    from_status = models.CharField(choices=Application.STATUSES, max_length=20, null=True, blank=True)
+    to_status = models.CharField(choices=Application.STATUSES, max_length=20)
+    created = models.DateTimeField(default=timezone.now)
+    # how long the transition took, from the start of the transition to updating the application
+    latency = models.DurationField(null=True, blank=True)
+    # how long the application was in `from_status` (its dwell time), not part of the latency
+    dwell = models.DurationField(null=True, blank=True)
+
+    objects = ApplicationEventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['listing', 'student', 'created'], name='application_event_history'),
+            models.Index(fields=['transition', 'created'], name='application_event_transition')
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError('Application events can not be changed')
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f'{self.student_id} - {self.listing_id}: {self.from_status} -> {self.to_status}'
+
+
+class ListingSummary(models.Model):
+    """
+    The number of applications in every status for a listing, kept up to date by every transition
+    in the same transaction, so pages can read one row instead of counting applications.
+    """
+
+    # the field counting the applications in every status, declined and withdrawn applications aren't counted
+    FIELDS = {
+        Application.APPLIED: 'applied',
+        Application.INTERVIEW: 'interviewing',
+        Application.AWAITING: 'awaiting',
+        Application.ACCEPTED: 'accepted',
+        Application.REJECTED: 'rejected',
+    }
+
+    listing = models.OneToOneField(Listing, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    applied = models.PositiveIntegerField(default=0)
+    interviewing = models.PositiveIntegerField(default=0)
+    awaiting = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    last_activity = models.DateTimeField(null=True, blank=True)
+
+    @classmethod
+    def refresh(cls, listing_id, last_activity=None):
+        """
+        Count a listing's applications again and save the summary.
+        The summary is created with the listing, if it's missing `get_or_create` inserts it in a savepoint and reads
+        the row a concurrent refresh inserted instead of raising. The row is locked before counting, so a transition
+        that updates the counters at the same time isn't overwritten with older counts
+        """
+        with transaction.atomic():
+            cls.objects.get_or_create(listing_id=listing_id)
+            summary = cls.objects.select_for_update().get(listing_id=listing_id)
+            counts = dict(Application.objects.filter(listing_id=listing_id, status__in=cls.FIELDS)
+                          .values_list('status').annotate(models.Count('id')).order_by())
+            for status, field in cls.FIELDS.items():
+                setattr(summary, field, counts.get(status, 0))
+            if last_activity is not None:
+                summary.last_activity = last_activity
+            summary.save()
+        return summary
+
+    @classmethod
+    def record(cls, changes, now):
+        """
+        Update the summaries for applications that changed status, one `UPDATE` per listing
+
+        @type changes: `list`
+        @param changes: `(listing_id, from_status, to_status)` for every application, `from_status` is `None`
+        for a new application
+        @param now: when the applications changed
+        """
+        deltas = {}
+        for listing_id, from_status, to_status in changes:
+            listing_deltas = deltas.setdefault(listing_id, {})
+            for status, delta in ((from_status, -1), (to_status, 1)):
+                if status in cls.FIELDS:
+                    field = cls.FIELDS[status]
+                    listing_deltas[field] = listing_deltas.get(field, 0) + delta
+
+        for listing_id, listing_deltas in deltas.items():
+            # a counter that drifted (rows changed by hand) stays at 0 instead of failing the transition
+            updates = {field: models.F(field) + delta if delta > 0 else Greatest(models.F(field) + delta, 0)
+                       for field, delta in listing_deltas.items() if delta}
+            if not cls.objects.filter(listing_id=listing_id).update(last_activity=now, **updates):
+                cls.refresh(listing_id, now)
+
+    @property
+    def open(self) -> int:
+        return self.applied + self.interviewing
+
+    def __str__(self):
+        return f'{self.listing_id}: {self.open} open, {self.awaiting} awaiting, {self.accepted} accepted'
+
+
+class ListingSearchTerm(models.Model):
+    """
+    Inverted index for searching listings, one row per listing and term.  
+    The weight ranks listings that contain the term in their title above ones that only mention it in the description.
+    """
+
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=50, db_index=True)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['listing', 'term'], name='unique_listing_search_term')
+        ]
+
+    def __str__(self):
+        return self.term
+
+
 class Career(models.Model):
     career = models.CharField(max_length=30)
 
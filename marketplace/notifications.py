@@ -0,0 +1,45 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count
+
+
+"""
+Helpers for the "someone applied!" notifications employers get for their listings  
+The listing is the notification's actor and the student is the action object, the actor's content type is
+always filtered on so notifications from another model with the same id aren't counted.
+Both helpers are covered by the `notification_recipient_unread_actor` index  
+
+1. **`unread_counts`** - the number of unread notifications for every listing, in one query
+2. **`has_unread_application`** - if there's already an unread notification for an application
+"""
+
+
+def unread_counts(user) -> dict:
+    """
+    Count the user's unread notifications grouped by listing
+
+    @type user: `User`  
+    @param user: the employer  
+    @rtype: `dict`  
+    @return: the number of unread notifications by listing id, listings without any are left out
+    """
+    # marketplace.models imports this module
+    from .models import Listing
+
+    counts = (user.notifications.unread().filter(actor_content_type=ContentType.objects.get_for_model(Listing))
+              .values_list('actor_object_id')
+              .annotate(count=Count('id')).order_by())
+    return {int(actor_id): count for actor_id, count in counts if actor_id.isdigit()}
+
+
+def has_unread_application(listing, student) -> bool:
+    """
+    @type listing: `Listing`  
+    @param listing: the listing the student applied to  
+    @type student: `User`  
+    @param student: the student that applied  
+    @rtype: `bool`  
+    @return: if the listing's company hasn't read a notification about this student applying yet
+    """
+    return listing.company.notifications.unread().filter(
+        actor_content_type=ContentType.objects.get_for_model(listing), actor_object_id=listing.id,
+        action_object_object_id=student.id).exists()
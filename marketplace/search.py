@@ -0,0 +1,98 @@
+import re
+
+from django.db.models import OuterRef, Q, Subquery, Sum
+
+from .models import ListingSearchTerm
+
+"""
+Full text search for the marketplace application  
+Every listing is split into lowercase terms that are stored in the `ListingSearchTerm` table, an inverted index
+that is kept up to date by the marketplace signals. Currently we support the following functions:
+
+1. **`tokenize`** - split text into search terms
+2. **`listing_terms`** - weighted search terms of a listing
+3. **`index_listing`** - (re)build the search terms of a listing
+4. **`search_listings`** - filter and rank listings by a search query
+
+"""
+
+TERM_PATTERN = re.compile(r'\w+')
+MAX_TERM_LENGTH = 50
+
+# how much a term counts towards the rank of a listing depending on where it appears
+TITLE_WEIGHT = 4
+CAREER_WEIGHT = 2
+COMPANY_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+
+def tokenize(text) -> set:
+    """
+    Split text into a set of lowercase search terms
+
+    @type text: `str`  
+    @param text: the text to split  
+    @rtype: `set`
+    """
+    if not text:
+        return set()
+    return {term[:MAX_TERM_LENGTH] for term in TERM_PATTERN.findall(text.lower())}
+
+
+def listing_terms(title, description, career, company_name) -> dict:
+    """
+    Weighted search terms for a listing, a term that appears in several fields adds up their weights
+
+    @rtype: `dict`  
+    @returns: term -> weight
+    """
+    terms = {}
+    for text, weight in ((title, TITLE_WEIGHT), (career, CAREER_WEIGHT),
+                         (company_name, COMPANY_WEIGHT), (description, DESCRIPTION_WEIGHT)):
+        for term in tokenize(text):
+            terms[term] = terms.get(term, 0) + weight
+    return terms
+
+
+def index_listing(listing) -> None:
+    """
+    Replace the search terms of a listing with the terms of its current title, description, career and company
+
+    @type listing: `Listing`  
+    @param listing: the listing to index
+    """
+    company_name = getattr(getattr(listing.company, 'employer_profile', None), 'company_name', None)
+    career = listing.career.career if listing.career_id else None
+    terms = listing_terms(listing.title, listing.description, career, company_name)
+
+    ListingSearchTerm.objects.filter(listing=listing).delete()
+    ListingSearchTerm.objects.bulk_create([ListingSearchTerm(listing=listing, term=term, weight=weight)
+                                           for term, weight in terms.items()])
+
+
+def search_listings(queryset, query):
+    """
+    Filter listings to the ones that match every term of the query and rank them.  
+    The last term of the query also matches as a prefix, so results show up while the user is still typing.
+
+    @type queryset: `QuerySet`  
+    @param queryset: the listings to search, may already be filtered  
+    @type query: `str`  
+    @param query: the search query  
+    @rtype: `QuerySet`  
+    @returns: the matching listings annotated with `search_rank` and ordered by it
+    """
+    words = TERM_PATTERN.findall(query.lower())
+    if not words:
+        return queryset
+
+    matches = Q()
+    for i, word in enumerate(words):
+        word = word[:MAX_TERM_LENGTH]
+        match = Q(term__startswith=word) if i == len(words) - 1 else Q(term=word)
+        queryset = queryset.filter(id__in=ListingSearchTerm.objects.filter(match).values('listing_id'))
+        matches |= match
+
+    rank = ListingSearchTerm.objects.filter(matches, listing=OuterRef('pk')) \
+        .values('listing').annotate(rank=Sum('weight')).values('rank')
+    return queryset.annotate(search_rank=Subquery(rank)).order_by('-search_rank', '-posted', '-id')
@@ -1,12 +1,60 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django_unique_slugify import unique_slugify
 
-from marketplace.models import Listing
+from accounts.models import EmployerProfile
+from helpers.cache import bump_version
+from marketplace.choices import invalidate_choices
+from marketplace.models import Listing, Career, ListingSummary
+from marketplace.search import index_listing
 
 @receiver(post_save, sender=Listing)
-def slugify(sender, instance, created, **kwargs):
+def create_summary(sender, instance, created, **kwargs):
     if created:
-        instance.slug = instance.title
-        unique_slugify(instance, instance.slug)
-        instance.save()
+        ListingSummary.objects.get_or_create(listing=instance)
+
+
+@receiver(post_save, sender=Listing)
+def index_listing_terms(sender, instance, **kwargs):
+    index_listing(instance)
+
+
+@receiver(post_save, sender=Career)
+def index_career_listings(sender, instance, created, **kwargs):
+    if not created:
+        for listing in instance.listings.select_related('company__employer_profile'):
+            index_listing(listing)
+
+
+@receiver(post_save, sender=EmployerProfile)
+def index_company_listings(sender, instance, created, **kwargs):
+    if not created:
+        for listing in instance.user.listing.select_related('career', 'company__employer_profile'):
+            index_listing(listing)
+
+
+@receiver(post_save, sender=Career)
+@receiver(post_delete, sender=Career)
+@receiver(post_save, sender=EmployerProfile)
+@receiver(post_delete, sender=EmployerProfile)
+def invalidate_filter_choices(sender, **kwargs):
+    invalidate_choices()
+
+
+@receiver(post_save, sender=Listing)
+@receiver(post_delete, sender=Listing)
+def invalidate_listing(sender, instance, **kwargs):
+    bump_version(f'listing:{instance.id}')
+
+
+@receiver(post_save, sender=Career)
+def invalidate_career_listings(sender, instance, created, **kwargs):
+    if not created:
+        for listing_id in instance.listings.values_list('id', flat=True):
+            bump_version(f'listing:{listing_id}')
+
+
+@receiver(post_save, sender=EmployerProfile)
+def invalidate_company_listings(sender, instance, created, **kwargs):
+    if not created:
+        for listing_id in instance.user.listing.values_list('id', flat=True):
+            bump_version(f'listing:{listing_id}')
@@ -1,12 +1,24 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.http import QueryDict
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.http import HttpResponse
 from django.urls import reverse
 from django.utils import timezone
 
+from helpers import slugs
+from helpers.paginate import KeysetPaginator
 from mixins.init_accounts import InitAccountsMixin
-from marketplace.models import Listing, Career
+from marketplace import choices
+from marketplace.models import Listing, Career, Application
 
 
+@override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_RAISE=True)
 class ApplicationsTestCase(TestCase, InitAccountsMixin):
     @classmethod
     def setUpTestData(cls):
@@ -228,3 +240,237 @@ class ApplicationsTestCase(TestCase, InitAccountsMixin):
         self.update_listing(update_data)
         listing = Listing.objects.get(id=self.listing_id)
         self.assertTrue(listing.career == self.career)
+
+    def add_listing(self) -> Listing:
+        return Listing.objects.create(company=self.employer, title='some listing', type='Unpaid', where='Virtual',
+                                      career=self.career, application_deadline=timezone.now(),
+                                      description='description')
+
+    def count_queries(self, path) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_filter_listings_status_annotation(self):
+        self.login(self.student)
+        self.add_listing().apply(self.student)
+        expected = self.count_queries(reverse('filter'))
+
+        for _ in range(5):
+            self.add_listing().apply(self.student)
+        listing = self.add_listing()
+        listing.apply(self.student)
+        listing.accept(self.student)
+
+        self.assertEqual(self.count_queries(reverse('filter')), expected)
+        response = self.client.get(reverse('filter'))
+        statuses = {listing.id: listing.application_status for listing in response.context['object_list']}
+        self.assertEqual(statuses[listing.id], Application.AWAITING)
+        self.assertContains(response, 'Awaiting confirmation')
+
+    def search(self, **params) -> list:
+        response = self.client.get(reverse('filter'), data=params)
+        return [listing.id for listing in response.context['object_list']]
+
+    def test_search_listings_ranked(self):
+        self.login(self.student)
+        in_description = self.add_listing()
+        in_description.description = 'learn some python'
+        in_description.save()
+        in_title = self.add_listing()
+        in_title.title = 'Python developer'
+        in_title.save()
+        self.add_listing()
+        self.assertEqual(self.search(search='python'), [in_title.id, in_description.id])
+        self.assertEqual(self.search(search='pyth'), [in_title.id, in_description.id])
+        self.assertEqual(self.search(search='python developer'), [in_title.id])
+
+    def test_search_listings_with_filters(self):
+        self.login(self.student)
+        paid = self.add_listing()
+        paid.type = 'Paid'
+        paid.description = 'python'
+        paid.save()
+        unpaid = self.add_listing()
+        unpaid.description = 'python'
+        unpaid.save()
+        self.assertEqual(self.search(search='python', type='unpaid'), [unpaid.id])
+
+    def test_search_listings_career_and_company(self):
+        self.login(self.student)
+        listing = self.add_listing()
+        self.career.career = 'Marine biology'
+        self.career.save()
+        self.assertEqual(self.search(search='marine'), [listing.id])
+        self.assertEqual(self.search(search='some company'), [listing.id])
+
+    def test_marketplace_keyset_pagination(self):
+        self.login(self.student)
+        listings = [self.add_listing() for _ in range(65)]
+        newest_first = [listing.id for listing in reversed(listings)]
+
+        response = self.client.get(reverse('marketplace'))
+        self.assertEqual([listing.id for listing in response.context['object_list']], newest_first[:30])
+        self.assertEqual(response.context['pages'], [1, 2, 3])
+
+        response = self.client.get(reverse('marketplace'), {'cursor': response.context['page_obj'].next_cursor})
+        page = response.context['page_obj']
+        self.assertEqual(page.number, 2)
+        self.assertEqual([listing.id for listing in page.object_list], newest_first[30:60])
+
+        response = self.client.get(reverse('marketplace'), {'cursor': page.previous_cursor})
+        self.assertEqual([listing.id for listing in response.context['object_list']], newest_first[:30])
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+        response = self.client.get(reverse('marketplace'), {'page': 3})
+        self.assertEqual([listing.id for listing in response.context['object_list']], newest_first[60:])
+        self.assertFalse(response.context['page_obj'].has_next())
+
+    def test_deep_page_links_without_offset(self):
+        listings = [self.add_listing() for _ in range(20)]
+        newest_first = [listing.id for listing in reversed(listings)]
+        paginator = KeysetPaginator(Listing.objects.all(), 2, ('-posted', '-id'))
+
+        links = dict(paginator.links(paginator.page(), list(range(1, 11))))
+        self.assertEqual(links[2], 'page=2')
+        cursor = QueryDict(links[9])['cursor']
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.page(cursor=cursor)
+        self.assertFalse([query for query in queries.captured_queries if 'OFFSET' in query['sql']])
+        self.assertEqual(page.number, 9)
+        self.assertEqual([listing.id for listing in page.object_list], newest_first[16:18])
+
+        # the pages before a deep page are linked with cursors too
+        links = dict(paginator.links(page, list(range(4, 11))))
+        self.assertEqual(links[9], page.query)
+        page = paginator.page(cursor=QueryDict(links[7])['cursor'])
+        self.assertEqual((page.number, [listing.id for listing in page.object_list]), (7, newest_first[12:14]))
+        self.assertEqual(links[4], 'page=4')
+        self.assertRaises(EmptyPage, paginator.page, number=9)
+
+    def test_marketplace_invalid_cursor(self):
+        self.login(self.student)
+        response = self.client.get(reverse('marketplace'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def filter_choices(self):
+        response = self.client.get(reverse('marketplace'))
+        return response.context['filter_choices']
+
+    def test_filter_choices_cached(self):
+        cache.clear()
+        self.login(self.student)
+        self.assertIn('some career', self.filter_choices()['career'])
+        with CaptureQueriesContext(connection) as queries:
+            self.filter_choices()
+        self.assertFalse([query for query in queries if 'FROM "marketplace_career"' in query['sql']
+                          or 'FROM "accounts_employerprofile"' in query['sql']])
+
+        # saving or deleting a career or a company renders the choices again
+        career = self.create_new_career()
+        self.assertIn('rand career', self.filter_choices()['career'])
+        career.delete()
+        self.assertNotIn('rand career', self.filter_choices()['career'])
+        self.employer.employer_profile.company_name = 'another company'
+        self.employer.employer_profile.save()
+        self.assertIn('another company', self.filter_choices()['company'])
+
+    def test_company_typeahead(self):
+        cache.clear()
+        self.login(self.student)
+        self.assertIn('<select', self.filter_choices()['company'])
+        with mock.patch.object(choices, 'COMPANY_DROPDOWN_LIMIT', 0):
+            choices.invalidate_choices()
+            company = self.filter_choices()['company']
+        self.assertNotIn('<select', company)
+        self.assertIn(reverse('company_typeahead'), company)
+
+        response = self.client.get(reverse('company_typeahead'), {'q': 'SOME'})
+        self.assertEqual(response.json(), {'companies': [{'id': self.employer.id, 'name': 'some company'}]})
+        response = self.client.get(reverse('company_typeahead'), {'q': 'other'})
+        self.assertEqual(response.json(), {'companies': []})
+
+    def test_listing_detail_invalidated(self):
+        self.login(self.student)
+        listing = self.add_listing()
+        self.assertContains(self.client.get(listing.get_absolute_url()), 'some listing')
+        listing.description = 'a new description'
+        listing.save()
+        self.assertContains(self.client.get(listing.get_absolute_url()), 'a new description')
+        self.career.career = 'Marine biology'
+        self.career.save()
+        self.assertContains(self.client.get(listing.get_absolute_url()), 'Marine biology')
+
+    def test_listing_slugs_unique(self):
+        first, second = self.add_listing(), self.add_listing()
+        self.assertEqual(first.slug, 'some-listing')
+        self.assertEqual(second.slug, 'some-listing-2')
+        self.assertTrue(Listing._meta.get_field('slug').unique)
+
+    def test_listing_slug_one_insert(self):
+        self.add_listing()
+        with CaptureQueriesContext(connection) as queries:
+            self.add_listing()
+        sql = [query['sql'] for query in queries.captured_queries]
+        self.assertFalse([query for query in sql if query.startswith('UPDATE "marketplace_listing"')])
+        # the taken suffixes are read with one query
+        self.assertEqual(len([query for query in sql if 'LIKE' in query and 'marketplace_listing' in query]), 1)
+
+    def test_listing_slug_taken_concurrently(self):
+        self.add_listing()
+        allocate = slugs.unique_slug
+        # the first allocation read the taken slugs before the other listing was inserted
+        stale = iter(['some-listing'])
+        with mock.patch.object(slugs, 'unique_slug', side_effect=lambda *args: next(stale, None) or allocate(*args)):
+            listing = self.add_listing()
+        self.assertEqual(listing.slug, 'some-listing-2')
+        self.assertEqual(Listing.objects.filter(title='some listing').count(), 2)
+
+    def test_listing_slug_kept_on_edit(self):
+        listing = self.add_listing()
+        listing.title = 'another title'
+        listing.save()
+        self.assertEqual(Listing.objects.get(id=listing.id).slug, 'some-listing')
+
+
+class CopyApplicationStateTestCase(TransactionTestCase):
+    """
+    The data migration from the old ManyToMany state fields to `Application`
+    """
+
+    before = [('marketplace', '0024_application')]
+    after = [('marketplace', '0025_copy_application_state')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        self.apps = executor.loader.project_state(self.before).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_copy_application_state(self):
+        User = self.apps.get_model('accounts', 'User')
+        Listing = self.apps.get_model('marketplace', 'Listing')
+        Career = self.apps.get_model('marketplace', 'Career')
+        company = User.objects.create(email='company@test.com', is_employer=True)
+        listing = Listing.objects.create(company=company, career=Career.objects.create(career='Law'), title='title',
+                                         type='Paid', where='Virtual', time_commitment='10 hours a week',
+                                         application_deadline=timezone.now(), description='description')
+        declined, reapplied, rejected = [User.objects.create(email=f'{name}@test.com', is_student=True)
+                                         for name in ('declined', 'reapplied', 'rejected')]
+        # accepted and then declined the offer, only `already_applied` is left
+        listing.already_applied.add(declined)
+        # rejected and then applied again
+        listing.rejections.add(reapplied, rejected)
+        listing.applications.add(reapplied)
+        listing.already_applied.add(reapplied, rejected)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        Application = executor.loader.project_state(self.after).apps.get_model('marketplace', 'Application')
+        statuses = dict(Application.objects.values_list('student__email', 'status'))
+        self.assertEqual(statuses, {'declined@test.com': 'Declined', 'reapplied@test.com': 'Applied',
+                                    'rejected@test.com': 'Rejected'})
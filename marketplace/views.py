@@ -1,34 +1,46 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Q
+from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, ListView, DetailView, UpdateView
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
 
+from .choices import filter_choices, company_typeahead
 from .forms import CreateListingForm, Filter
 from .models import Listing, Career
-from helpers.paginate import paginate
+from .search import search_listings
+from helpers.cache import get_version
+from helpers.paginate import paginate, page_links
+from mixins.keyset_pagination import KeysetPaginationMixin
+from mixins.replica_reads import ReplicaReadsMixin
 
-__all__ = ['Marketplace', 'CreateListing', 'FilterListings', 'ViewListing', 'delete_listing', 'EditListing']
+__all__ = ['Marketplace', 'CreateListing', 'FilterListings', 'ViewListing', 'delete_listing', 'EditListing',
+           'company_search']
 
 
-class Marketplace(LoginRequiredMixin, ListView):
+class Marketplace(LoginRequiredMixin, ReplicaReadsMixin, KeysetPaginationMixin, ListView):
     model = Listing
-    ordering = ['-posted']
     template_name = 'marketplace/marketplace.html'
     paginate_by = 30
+    keyset_ordering = ('-posted', '-id')
+
+    def get_queryset(self):
+        queryset = super().get_queryset().select_related('company__employer_profile')
+        return queryset.with_application_status(self.request.user)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
         context['filters'] = Filter()
+        context['filter_choices'] = filter_choices(context['filters'])
 
         if not context.get('is_paginated', False):
             return context
 
         pages = paginate(context)
 
-        context.update({'pages': pages})
+        context.update({'pages': pages, 'page_links': page_links(context)})
         return context
 
 
@@ -49,11 +61,19 @@ class CreateListing(LoginRequiredMixin, CreateView):
             return redirect('error')
 
 
-class FilterListings(LoginRequiredMixin, ListView):
+class FilterListings(LoginRequiredMixin, ReplicaReadsMixin, KeysetPaginationMixin, ListView):
     template_name = 'marketplace/listings.html'
     model = Listing
     queryset = Listing.objects.all().order_by('-posted')
     paginate_by = 30
+    keyset_ordering = ('-posted', '-id')
+    # the filtered results are rendered without a page menu, so the total is never needed
+    paginate_count = False
+
+    def get_keyset_ordering(self, queryset):
+        if 'search_rank' in queryset.query.annotations:
+            return ('-search_rank',) + self.keyset_ordering
+        return self.keyset_ordering
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -69,20 +89,36 @@ class FilterListings(LoginRequiredMixin, ListView):
             for i in range(len(params.getlist('career'))):
                 if params.getlist('career')[i].isdigit():
                     query = query & Q(career_id=int(params.getlist('career')[i]))
-        if params.get('search'):
-            query = query & Q(title__icontains=params.get('search')) | Q(description__icontains=params.get('search'))
         if params.get('company'):
             query = query & Q(company=params.get('company'))
 
-        queryset = queryset.filter(query)
+        queryset = queryset.filter(query).select_related('company__employer_profile')
+        if params.get('search'):
+            queryset = search_listings(queryset, params.get('search'))
+
+        return queryset.with_application_status(self.request.user)
 
-        return queryset
 
+@login_required
+def company_search(request):
+    """The companies for the typeahead that replaces the company filter when there are too many companies"""
+    return JsonResponse({'companies': company_typeahead(request.GET.get('q', '').strip())})
 
-class ViewListing(LoginRequiredMixin, DetailView):
+
+class ViewListing(LoginRequiredMixin, ReplicaReadsMixin, DetailView):
     model = Listing
     template_name = 'marketplace/single-listing.html'
 
+    def get_queryset(self):
+        queryset = super().get_queryset().select_related('company__employer_profile', 'career')
+        return queryset.with_application_status(self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['status'] = getattr(self.object, 'application_status', None)
+        context['listing_version'] = get_version(f'listing:{self.object.id}')
+        return context
+
 
 @login_required
 def delete_listing(request, listing_id):
@@ -0,0 +1,17 @@
+from applications.dashboard import employer_dashboard
+
+
+class EmployerDashboardMixin(object):
+    """
+    Adds a section of the employer dashboard to the context as `dashboard` when the user is an employer
+
+    @cvar dashboard_section: the section of the dashboard to build, one of `applications.dashboard.SECTIONS`
+    """
+
+    dashboard_section = None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if getattr(self.request.user, 'is_employer', False):
+            context['dashboard'] = employer_dashboard(self.request.user, self.dashboard_section)
+        return context
@@ -0,0 +1,27 @@
+from django.core.paginator import InvalidPage
+from django.http import Http404
+
+from helpers.paginate import KeysetPaginator
+
+
+class KeysetPaginationMixin(object):
+    """
+    Paginates a `ListView` with a `KeysetPaginator`. The next and previous pages are requested with
+    the `cursor` parameter, the `page` parameter still works for links to a specific page.
+    """
+
+    keyset_ordering = ('-id',)
+    paginate_count = True
+    paginate_count_timeout = 60
+
+    def get_keyset_ordering(self, queryset):
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, self.get_keyset_ordering(queryset),
+                                    count=self.paginate_count, count_timeout=self.paginate_count_timeout)
+        try:
+            page = paginator.page(cursor=self.request.GET.get('cursor'), number=self.request.GET.get('page'))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,28 @@
+from django.conf import settings
+
+from connect_x.database import statement_timeout, REPLICA
+from connect_x.routers import replica_reads, reads_from_primary
+
+
+class ReplicaReadsMixin(object):
+    """
+    Run a read only view's queries on the read replica, including the ones run while its template is rendered.
+    Writes still go to the primary database. The queries are limited to `read_statement_timeout` milliseconds
+    so a slow search can't hold a connection for long. Put it after `LoginRequiredMixin`,
+    so the user is loaded from the primary database.
+    A user that just wrote to the database reads from the primary database for a few seconds,
+    see `ReadYourWritesMiddleware`
+    """
+
+    read_statement_timeout = 5000
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or reads_from_primary(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        using = REPLICA if REPLICA in settings.DATABASES else 'default'
+        with replica_reads(), statement_timeout(self.read_statement_timeout, using=using):
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+        return response
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt', 'created', 'sent')
+    list_filter = ('status',)
+    actions = ['retry']
+
+    def retry(self, request, queryset):
+        queryset.exclude(status=OutboxEmail.SENT).update(status=OutboxEmail.PENDING, attempts=0,
+                                                           next_attempt=timezone.now())
+    retry.short_description = 'Retry the selected emails'
+
+
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
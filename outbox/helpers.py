@@ -0,0 +1,143 @@
+import random
+from datetime import timedelta
+
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import OutboxEmail
+from .pool import SMTPPool
+
+
+"""
+Helper functions for the email outbox
+Currently we support the following 6 helper functions:
+
+1. **`enqueue_email`** - writes an email to the outbox, it's sent once the current transaction commits
+2. **`enqueue_emails`** - writes many emails to the outbox at once
+3. **`backoff`** - how long to wait before retrying an email that failed
+4. **`claim_emails`** - claims a batch of due emails for a worker
+5. **`deliver_pending`** - sends a batch of due emails, retrying or dead lettering the ones that fail
+6. **`queue_depth`** - counts the emails that are waiting to be sent
+"""
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 30
+BACKOFF_MAX = 60 * 60 * 6
+LEASE = 60 * 5
+
+
+def enqueue_email(from_email, body, to, subject, reply_to=None) -> OutboxEmail:
+    """
+    Write an email to the outbox. Call it inside the same transaction as the change the email is about,
+    so the email is only sent if the change is saved
+
+    @param to: the addresses to send the email to
+    @type to: `list`
+    @param reply_to: the addresses replies should go to
+    @type reply_to: `list`
+    """
+    email = _outbox_email(from_email=from_email, body=body, to=to, subject=subject, reply_to=reply_to)
+    email.save()
+    return email
+
+
+def enqueue_emails(emails) -> list:
+    """
+    Write many emails to the outbox in one statement
+
+    @param emails: the arguments to `enqueue_email` for every email
+    @type emails: `list` of `dict`
+    """
+    return OutboxEmail.objects.bulk_create([_outbox_email(**email) for email in emails])
+
+
+def _outbox_email(from_email, body, to, subject, reply_to=None) -> OutboxEmail:
+    return OutboxEmail(from_email=from_email, body=body, subject=subject, to=[address for address in to if address],
+                       reply_to=[address for address in reply_to or [] if address])
+
+
+def backoff(attempts) -> timedelta:
+    """
+    Exponential backoff with jitter, capped at `BACKOFF_MAX` seconds
+
+    @param attempts: how many times sending the email has failed
+    @type attempts: `int`
+    """
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return timedelta(seconds=delay + random.uniform(0, delay / 10))
+
+
+def claim_emails(batch_size, lease=LEASE) -> list:
+    """
+    Claim up to `batch_size` emails that are due. Claimed emails aren't due again until the lease runs out,
+    so other workers skip them, and an email claimed by a worker that crashed is retried after the lease
+
+    @param lease: how long the worker has to send the emails in seconds
+    @type lease: `int`
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(OutboxEmail.objects.select_for_update(skip_locked=True)
+                   .filter(status=OutboxEmail.PENDING, next_attempt__lte=now)
+                   .order_by('next_attempt', 'id').values_list('id', flat=True)[:batch_size])
+        OutboxEmail.objects.filter(id__in=ids).update(next_attempt=now + timedelta(seconds=lease))
+    return list(OutboxEmail.objects.filter(id__in=ids).order_by('id'))
+
+
+def deliver_pending(batch_size=50, max_attempts=MAX_ATTEMPTS, pool=None) -> dict:
+    """
+    Send a batch of due emails. An email that fails is retried with backoff,
+    after `max_attempts` failures it's marked as dead and left for an admin to look at
+
+    @param pool: the connections to send the emails over, a pool with one connection is used if it's `None`
+    @type pool: `SMTPPool`
+    @returns: the number of emails that were `sent`, will be `retried` and are `dead`,
+    and the `latency` between queueing and sending the oldest email in seconds
+    """
+    if pool is None:
+        with SMTPPool(size=1) as pool:
+            return deliver_pending(batch_size, max_attempts, pool)
+
+    results = {'sent': 0, 'retried': 0, 'dead': 0, 'latency': 0.0}
+    emails = claim_emails(batch_size)
+    if not emails:
+        return results
+
+    messages = [EmailMessage(subject=email.subject, body=email.body, from_email=email.from_email,
+                             to=email.to, reply_to=email.reply_to) for email in emails]
+    sent = []
+    for email, error in zip(emails, pool.send(messages)):
+        if error is None:
+            sent.append(email.id)
+        else:
+            results[_failed(email, error, max_attempts)] += 1
+
+    now = timezone.now()
+    OutboxEmail.objects.filter(id__in=sent).update(status=OutboxEmail.SENT, sent=now,
+                                                   attempts=F('attempts') + 1, last_error='')
+    results['sent'] = len(sent)
+    if sent:
+        results['latency'] = (now - min(email.created for email in emails if email.id in sent)).total_seconds()
+    return results
+
+
+def queue_depth() -> dict:
+    """
+    The number of emails waiting to be sent, and the number that are dead
+    """
+    counts = dict(OutboxEmail.objects.exclude(status=OutboxEmail.SENT)
+                  .values_list('status').annotate(Count('id')).order_by())
+    return {'pending': counts.get(OutboxEmail.PENDING, 0), 'dead': counts.get(OutboxEmail.DEAD, 0)}
+
+
+def _failed(email, error, max_attempts) -> str:
+    attempts = email.attempts + 1
+    if attempts >= max_attempts:
+        OutboxEmail.objects.filter(id=email.id).update(status=OutboxEmail.DEAD, attempts=attempts,
+                                                       last_error=repr(error))
+        return 'dead'
+    OutboxEmail.objects.filter(id=email.id).update(attempts=attempts, last_error=repr(error),
+                                                   next_attempt=timezone.now() + backoff(attempts))
+    return 'retried'
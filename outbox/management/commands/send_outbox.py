@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from outbox.helpers import deliver_pending, queue_depth, MAX_ATTEMPTS
+from outbox.pool import SMTPPool
+
+
+class Command(BaseCommand):
+    help = 'Send the emails waiting in the outbox, retrying failed emails with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Send one batch and exit')
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Seconds to wait when there is nothing to send')
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+        parser.add_argument('--connections', type=int, default=2,
+                            help='The number of mail connections to keep open')
+        parser.add_argument('--send-batch-size', type=int, default=20,
+                            help='The number of emails sent over a connection at once')
+
+    def handle(self, *args, **options):
+        with SMTPPool(size=options['connections'], batch_size=options['send_batch_size']) as pool:
+            while True:
+                results = deliver_pending(options['batch_size'], options['max_attempts'], pool)
+                if results['sent'] or results['retried'] or results['dead']:
+                    self.log(results, pool)
+                if options['once']:
+                    return
+                if results['sent'] + results['retried'] + results['dead'] < options['batch_size']:
+                    time.sleep(options['interval'])
+
+    def log(self, results, pool):
+        depth = queue_depth()
+        stats = pool.stats()
+        average = stats['send_seconds'] / stats['batches'] if stats['batches'] else 0
+        self.stdout.write(f"sent {results['sent']}, retrying {results['retried']}, dead {results['dead']}, "
+                          f"latency {results['latency']:.1f}s | queue {depth['pending']}, dead {depth['dead']} | "
+                          f"total sent {stats['sent']}, failed {stats['failed']}, "
+                          f"connections {stats['connections']}, {average:.2f}s per batch")
@@ -0,0 +1,105 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.mail import get_connection
+
+
+class SMTPPool:
+    """
+    A fixed number of mail connections that are kept open between batches, so sending a burst of emails
+    costs a few TLS handshakes instead of one per email. Messages are split into batches and every batch
+    is sent over one connection with `send_messages`, at most `size` batches are sent at the same time.
+
+    @param size: the number of connections (and sending threads)
+    @type size: `int`
+    @param batch_size: the number of messages sent over a connection at once
+    @type batch_size: `int`
+    """
+
+    def __init__(self, size=2, batch_size=20):
+        self.size = size
+        self.batch_size = batch_size
+        self.connections = queue.LifoQueue()
+        for _ in range(size):
+            self.connections.put(get_connection(fail_silently=False))
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='smtp-pool')
+        self.lock = threading.Lock()
+        self.counters = {'batches': 0, 'sent': 0, 'failed': 0, 'connections': 0, 'send_seconds': 0.0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _count(self, **counts):
+        with self.lock:
+            for counter, value in counts.items():
+                self.counters[counter] += value
+
+    def _open(self, connection):
+        # the SMTP backend returns True when it opens a new connection, and None if one is already open
+        if connection.open():
+            self._count(connections=1)
+
+    def _send_one(self, connection, message):
+        try:
+            self._open(connection)
+            connection.send_messages([message])
+        except Exception as e:
+            connection.close()
+            return e
+        return None
+
+    def _send_batch(self, messages) -> list:
+        connection = self.connections.get()
+        start = time.monotonic()
+        try:
+            results = self._send_over(connection, messages)
+        finally:
+            self.connections.put(connection)
+
+        failed = len([result for result in results if result is not None])
+        self._count(batches=1, sent=len(messages) - failed, failed=failed, send_seconds=time.monotonic() - start)
+        return results
+
+    def _send_over(self, connection, messages) -> list:
+        try:
+            self._open(connection)
+        except Exception as e:
+            connection.close()
+            return [e] * len(messages)
+
+        try:
+            connection.send_messages(messages)
+        except Exception:
+            # the batch stops at the first error, send the messages one by one to find out which failed.
+            # messages before the error are sent again, the outbox already delivers at least once
+            connection.close()
+            return [self._send_one(connection, message) for message in messages]
+        return [None] * len(messages)
+
+    def send(self, messages) -> list:
+        """
+        Send the messages over the pooled connections
+
+        @param messages: the messages to send
+        @type messages: `list` of `EmailMessage`
+        @returns: `None` for every message that was sent, or the exception that stopped it from being sent
+        """
+        batches = [messages[i:i + self.batch_size] for i in range(0, len(messages), self.batch_size)]
+        results = []
+        for batch_results in self.executor.map(self._send_batch, batches):
+            results.extend(batch_results)
+        return results
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.counters)
+
+    def close(self):
+        self.executor.shutdown()
+        while not self.connections.empty():
+            self.connections.get().close()
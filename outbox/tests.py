@@ -0,0 +1,194 @@
+import io
+import socketserver
+import threading
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .helpers import enqueue_email, deliver_pending, queue_depth
+from .models import OutboxEmail
+from .pool import SMTPPool
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Just enough SMTP to stand in for the mail server, it keeps every message it receives
+    """
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost ESMTP')
+        data, lines = False, []
+        for line in self.rfile:
+            if data:
+                if line.rstrip(b'\r\n') == b'.':
+                    self.server.messages.append(b''.join(lines).decode())
+                    data, lines = False, []
+                    self.reply('250 OK')
+                else:
+                    lines.append(line)
+                continue
+
+            command = line[:4].upper()
+            if command in (b'EHLO', b'HELO'):
+                self.reply('250 localhost')
+            elif command == b'MAIL' and self.server.fail:
+                self.reply('451 Try again later')
+            elif command == b'RCPT' and any(address.encode() in line for address in self.server.refuse):
+                self.reply('550 No such user')
+            elif command == b'DATA':
+                data = True
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.messages = []
+        self.connections = 0
+        self.fail = False
+        self.refuse = []
+
+
+class OutboxTestCase(TestCase):
+
+    def setUp(self):
+        self.server = SMTPServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        settings = override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                                     EMAIL_HOST='127.0.0.1', EMAIL_PORT=self.server.server_address[1],
+                                     EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='')
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def enqueue(self, subject='Hello', to='student@test.com') -> OutboxEmail:
+        return enqueue_email(from_email='team@interniac.org', body='body', to=[to],
+                             subject=subject, reply_to=['employer@test.com', None])
+
+    def deliver(self, **kwargs) -> dict:
+        results = deliver_pending(**kwargs)
+        results.pop('latency')
+        return results
+
+    def test_enqueue(self):
+        email = self.enqueue()
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertEqual(email.reply_to, ['employer@test.com'])
+        self.assertEqual(self.server.messages, [])
+
+    def test_deliver(self):
+        self.enqueue('First')
+        self.enqueue('Second')
+        self.assertEqual(self.deliver(), {'sent': 2, 'retried': 0, 'dead': 0})
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.SENT).count(), 2)
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertIn('Subject: First', self.server.messages[0])
+        self.assertEqual(self.server.connections, 1)
+        # sent emails aren't sent again
+        self.assertEqual(self.deliver(), {'sent': 0, 'retried': 0, 'dead': 0})
+
+    def test_retry_with_backoff(self):
+        email = self.enqueue()
+        self.server.fail = True
+        self.assertEqual(self.deliver(), {'sent': 0, 'retried': 1, 'dead': 0})
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt, timezone.now())
+        self.assertIn('451', email.last_error)
+
+        # not due yet
+        self.server.fail = False
+        self.assertEqual(self.deliver(), {'sent': 0, 'retried': 0, 'dead': 0})
+
+        OutboxEmail.objects.update(next_attempt=timezone.now())
+        self.assertEqual(self.deliver(), {'sent': 1, 'retried': 0, 'dead': 0})
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.SENT)
+        self.assertEqual(email.attempts, 2)
+
+    def test_dead_letter(self):
+        email = self.enqueue()
+        self.server.fail = True
+        for _ in range(3):
+            OutboxEmail.objects.update(next_attempt=timezone.now())
+            self.deliver(max_attempts=3)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.DEAD)
+        self.assertEqual(email.attempts, 3)
+
+    def test_server_down(self):
+        email = self.enqueue()
+        self.server.shutdown()
+        self.server.server_close()
+        self.assertEqual(self.deliver(), {'sent': 0, 'retried': 1, 'dead': 0})
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 1)
+
+    def test_claimed_emails_skipped(self):
+        email = self.enqueue()
+        OutboxEmail.objects.update(next_attempt=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(self.deliver(), {'sent': 0, 'retried': 0, 'dead': 0})
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+
+    def test_send_outbox_command(self):
+        self.enqueue()
+        call_command('send_outbox', '--once', stdout=io.StringIO())
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.SENT)
+        self.assertEqual(len(self.server.messages), 1)
+
+    def test_pool_reuses_connections(self):
+        with SMTPPool(size=2, batch_size=2) as pool:
+            for i in range(5):
+                self.enqueue(f'Email {i}')
+            results = deliver_pending(pool=pool)
+            self.assertEqual(results['sent'], 5)
+            for i in range(3):
+                self.enqueue(f'Later {i}')
+            self.assertEqual(deliver_pending(pool=pool)['sent'], 3)
+
+            stats = pool.stats()
+        self.assertEqual(stats['sent'], 8)
+        self.assertEqual(stats['batches'], 5)
+        self.assertLessEqual(stats['connections'], 2)
+        self.assertEqual(stats['connections'], self.server.connections)
+        self.assertEqual(len(self.server.messages), 8)
+
+    def test_pool_batch_with_refused_recipient(self):
+        self.enqueue('First', to='first@test.com')
+        refused = self.enqueue('Refused', to='refused@test.com')
+        self.enqueue('Last', to='last@test.com')
+        self.server.refuse = ['refused@test.com']
+
+        with SMTPPool(size=1, batch_size=3) as pool:
+            self.assertEqual(self.deliver(pool=pool), {'sent': 2, 'retried': 1, 'dead': 0})
+            self.assertEqual(pool.stats()['failed'], 1)
+        refused.refresh_from_db()
+        self.assertEqual(refused.status, OutboxEmail.PENDING)
+        self.assertIn('refused@test.com', refused.last_error)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.SENT).count(), 2)
+
+    def test_queue_depth(self):
+        self.enqueue()
+        self.enqueue()
+        OutboxEmail.objects.create(subject='Dead', body='body', to=['student@test.com'], status=OutboxEmail.DEAD)
+        self.assertEqual(queue_depth(), {'pending': 2, 'dead': 1})
+        self.deliver()
+        self.assertEqual(queue_depth(), {'pending': 0, 'dead': 1})